@@ -0,0 +1,71 @@
+"""Micro-benchmark for domain attribute access while rendering.
+
+Renders the topics and dependencies documentation for all registered domains,
+which mostly consists of accessing domain attributes. Once with memoized
+domain attributes, and once with attributes rebuilt on every access like
+mxmake did before memoization.
+
+Run with ``python benchmarks/domain_attributes.py``.
+"""
+
+from contextlib import contextmanager
+from jinja2 import Environment
+from mxmake.templates import get_template_environment
+from mxmake.templates import template
+from mxmake.topics import _MEMOIZED_DOMAIN_ATTRIBUTES
+from mxmake.topics import Domain
+from mxmake.topics import load_topics
+from mxmake.topics import Setting
+from mxmake.topics import Target
+from unittest import mock
+
+import sys
+import timeit
+
+
+def _rebuilt(name: str) -> property:
+    def rebuild(domain: Domain):
+        metadata = domain.metadata
+        if name == "settings":
+            return [Setting(*setting) for setting in metadata["settings"]]
+        if name == "targets":
+            return [Target(*target) for target in metadata["targets"]]
+        value = metadata[name]
+        return list(value) if isinstance(value, list) else value
+
+    return property(rebuild)
+
+
+@contextmanager
+def unmemoized(domains: list[Domain]):
+    with mock.patch.multiple(
+        Domain, **{name: _rebuilt(name) for name in _MEMOIZED_DOMAIN_ATTRIBUTES}
+    ):
+        yield
+    for domain in domains:
+        for name in _MEMOIZED_DOMAIN_ATTRIBUTES:
+            domain.__dict__.pop(name, None)
+
+
+def render(environment: Environment) -> None:
+    template.lookup("topics.md")(environment).render()
+    template.lookup("dependencies.md")(environment).render()
+
+
+def main(number: int = 50) -> None:
+    domains = [domain for topic in load_topics() for domain in topic.domains]
+    environment = get_template_environment()
+    render(environment)
+    with unmemoized(domains):
+        rebuilt = min(timeit.repeat(lambda: render(environment), number=number))
+    memoized = min(timeit.repeat(lambda: render(environment), number=number))
+    sys.stdout.write(
+        f"{len(domains)} domains, {number} renderings\n"
+        f"  rebuilt on access: {rebuilt * 1000 / number:.3f} ms/rendering\n"
+        f"  memoized:          {memoized * 1000 / number:.3f} ms/rendering\n"
+        f"  speedup:           {rebuilt / memoized:.2f}x\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Benchmark suite for the mxmake generation paths.
+
+Generates a synthetic project consisting of many topics and domains with deep
+dependency chains, a Makefile with many settings and a ``mx.ini`` with many
+packages, and times:
+
+- ``load_topics``: loading topics and metadata of all domains
+- ``resolve_domain_dependencies``: ordering all domains by dependencies
+- ``MakefileParser``: parsing the generated Makefile
+- ``Makefile``: rendering the Makefile template
+- ``Hook.write (cold)``: running the mxdev hook without a manifest, i.e.
+  rendering all templates
+- ``Hook.write (warm)``: running the mxdev hook with an up to date manifest,
+  i.e. skipping all templates
+- ``print_help``: printing the Makefile help
+
+Run with ``python benchmarks/run.py``. Use ``--output`` to store results as
+JSON and ``--compare`` to compare them against a baseline, e.g. the committed
+``benchmarks/baseline.json``.
+"""
+
+from contextlib import contextmanager
+from contextlib import redirect_stdout
+from mxmake import helpgen
+from mxmake import hook
+from mxmake import templates
+from mxmake import topics
+from mxmake.parser import MakefileParser
+from pathlib import Path
+from unittest import mock
+
+import argparse
+import io
+import json
+import logging
+import mxdev
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import typing
+
+
+SCALES = {
+    "small": {"topics": 5, "domains": 10, "settings": 5, "packages": 50},
+    "default": {"topics": 10, "domains": 20, "settings": 10, "packages": 300},
+    "large": {"topics": 20, "domains": 40, "settings": 20, "packages": 1000},
+}
+
+DOMAIN_BODY = """
+##############################################################################
+# {name}
+##############################################################################
+
+{name_upper}_TARGET:=$(SENTINEL_FOLDER)/{name}.sentinel
+$({name_upper}_TARGET): $(SENTINEL)
+	@echo "Building {name}"
+	@touch $({name_upper}_TARGET)
+
+.PHONY: {name}
+{name}: $({name_upper}_TARGET)
+
+.PHONY: {name}-dirty
+{name}-dirty:
+	@rm -f $({name_upper}_TARGET)
+
+INSTALL_TARGETS+={name}
+DIRTY_TARGETS+={name}-dirty
+"""
+
+
+def write_domain(
+    directory: Path,
+    topic: int,
+    domain: int,
+    settings: int,
+    depends: list[str],
+    soft_depends: list[str],
+) -> None:
+    name = f"t{topic}-d{domain}"
+    prefix = f"T{topic}_D{domain}"
+    lines = [
+        f"[d{domain}]",
+        f"title = Domain {domain} of topic {topic}",
+        f"description = Synthetic domain {domain} of topic {topic}.",
+        "depends =",
+        *(f"    {fqn}" for fqn in depends),
+        "soft-depends =",
+        *(f"    {fqn}" for fqn in soft_depends),
+        "",
+        f"[target.{name}]",
+        f"description = Build {name}.",
+        "",
+        f"[target.{name}-dirty]",
+        f"description = Rebuild {name} on next make run.",
+    ]
+    for setting in range(settings):
+        lines += [
+            "",
+            f"[setting.{prefix}_S{setting}]",
+            f"description = Setting {setting} of domain {name}.",
+            "  Spans multiple lines.",
+            f"default = value-{setting}",
+        ]
+    body = [f"{prefix}_S{setting}?=value-{setting}" for setting in range(settings)]
+    with (directory / f"d{domain}.mk").open("w") as f:
+        f.write("\n".join(f"#:{line}" for line in lines))
+        f.write("\n\n")
+        f.write("\n".join(body))
+        f.write(DOMAIN_BODY.format(name=name, name_upper=name.upper()))
+
+
+def create_topics(root: Path, scale: dict[str, int]) -> list[topics.Topic]:
+    """Create synthetic topics. Domains form one dependency chain across all
+    topics, each domain additionally soft depends on the first domain of the
+    previous topic.
+    """
+    result = []
+    previous = None
+    for topic in range(scale["topics"]):
+        directory = root / "topics" / f"t{topic}"
+        directory.mkdir(parents=True)
+        with (directory / "metadata.ini").open("w") as f:
+            f.write(f"[metadata]\ntitle = Topic {topic}\ndescription = Topic.\n")
+        for domain in range(scale["domains"]):
+            write_domain(
+                directory,
+                topic,
+                domain,
+                scale["settings"],
+                [previous] if previous else [],
+                [f"t{topic - 1}.d0"] if topic else [],
+            )
+            previous = f"t{topic}.d{domain}"
+        result.append(topics.Topic(name=f"t{topic}", directory=directory))
+    return result
+
+
+def create_mx_ini(root: Path, scale: dict[str, int]) -> Path:
+    sources = root / "sources"
+    lines = [
+        "[settings]",
+        "mxmake-templates =",
+        "    run-tests",
+        "    run-coverage",
+        "    pip-conf",
+        "",
+        "[mxmake-run-tests]",
+        "environment = env",
+        "",
+        "[mxmake-run-coverage]",
+        "environment = env",
+        "",
+        "[mxmake-env]",
+        "KEY = value",
+        "",
+        "[mxmake-pip-conf]",
+        "find-links = https://example.com/",
+    ]
+    for package in range(scale["packages"]):
+        name = f"package-{package}"
+        source = sources / name
+        source.mkdir(parents=True)
+        for filename in ("pyproject.toml", "setup.py", "README.md"):
+            (source / filename).touch()
+        lines += [
+            "",
+            f"[{name}]",
+            f"url = https://example.com/{name}.git",
+            f"target = {sources}",
+            "mxmake-test-path = src",
+            "mxmake-source-path = src/package",
+        ]
+    mx_ini = root / "mx.ini"
+    with mx_ini.open("w") as f:
+        f.write("\n".join(lines) + "\n")
+    return mx_ini
+
+
+def new_registry(topics_: list[topics.Topic]) -> topics.Registry:
+    fresh = [topics.Topic(name=t.name, directory=t.directory) for t in topics_]
+    return topics.Registry(fresh)
+
+
+@contextmanager
+def registered(registry: topics.Registry):
+    with mock.patch.object(topics, "get_registry", return_value=registry):
+        yield
+
+
+def measure(
+    fn: typing.Callable[[], typing.Any],
+    repeat: int,
+    setup: typing.Callable[[], typing.Any] | None = None,
+) -> dict[str, float]:
+    """Time ``fn``. ``setup`` is called untimed before each iteration."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def run(scale: dict[str, int], repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        os.environ["MXMAKE_CACHE"] = str(root / "cache")
+        os.environ["MXMAKE_FILES"] = str(root / "files")
+        synthetic_topics = create_topics(root, scale)
+
+        def load():
+            with registered(new_registry(synthetic_topics)):
+                for topic in topics.load_topics():
+                    for domain in topic.domains:
+                        domain.settings  # noqa: B018
+
+        results["load_topics"] = measure(load, repeat)
+
+        registry = new_registry(synthetic_topics)
+        with registered(registry):
+            domains = [d for t in topics.load_topics() for d in t.domains]
+
+            def resolve():
+                topics.set_domain_runtime_depends(domains)
+                topics.resolve_domain_dependencies(domains)
+
+            results["resolve_domain_dependencies"] = measure(resolve, repeat)
+
+            environment = templates.get_template_environment()
+            ordered = topics.resolve_domain_dependencies(domains)
+            makefile = templates.template.lookup("makefile")(
+                root, ordered, {}, environment
+            )
+            results["Makefile"] = measure(makefile.write, repeat)
+
+            makefile_path = root / "Makefile"
+            results["MakefileParser"] = measure(
+                lambda: MakefileParser(makefile_path), repeat
+            )
+
+            def help_():
+                with redirect_stdout(io.StringIO()):
+                    helpgen.print_help(makefile_path)
+
+            results["print_help"] = measure(help_, repeat)
+
+        mx_ini = create_mx_ini(root, scale)
+        hook_ = hook.Hook()
+        configuration = mxdev.Configuration(str(mx_ini), hooks=[hook_])
+        state = mxdev.State(configuration=configuration)
+        manifest = root / "files" / "manifest.json"
+        cwd = Path.cwd()
+        os.chdir(root)
+        try:
+            results["Hook.write (cold)"] = measure(
+                lambda: hook_.write(state),
+                repeat,
+                setup=lambda: manifest.unlink(missing_ok=True),
+            )
+            hook_.write(state)
+            results["Hook.write (warm)"] = measure(lambda: hook_.write(state), repeat)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> bool:
+    """Write comparison of results with baseline. Return whether all
+    benchmarks are within threshold.
+    """
+    success = True
+    sys.stdout.write(f"\n{'benchmark':<30} {'baseline':>10} {'current':>10} ratio\n")
+    for name, timing in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["min"]
+        ratio = timing["min"] / base if base else 1.0
+        marker = ""
+        if ratio > threshold:
+            marker = " REGRESSION"
+            success = False
+        sys.stdout.write(
+            f"{name:<30} {base * 1000:>8.2f}ms {timing['min'] * 1000:>8.2f}ms "
+            f"{ratio:.2f}{marker}\n"
+        )
+    return success
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scale", choices=SCALES, default="default")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to file")
+    parser.add_argument("--compare", help="Compare results with JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="Maximum ratio of current to baseline timing before failing",
+    )
+    args = parser.parse_args()
+    logging.getLogger("mxmake").setLevel(logging.ERROR)
+    logging.getLogger("mxdev").setLevel(logging.ERROR)
+
+    scale = SCALES[args.scale]
+    results = run(scale, args.repeat)
+    sys.stdout.write(f"{'benchmark':<30} {'min':>10} {'median':>10}\n")
+    for name, timing in results.items():
+        sys.stdout.write(
+            f"{name:<30} {timing['min'] * 1000:>8.2f}ms "
+            f"{timing['median'] * 1000:>8.2f}ms\n"
+        )
+    if args.output:
+        with Path(args.output).open("w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "scale": args.scale,
+                    "results": results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+            f.write("\n")
+    if args.compare:
+        with Path(args.compare).open() as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != args.scale:
+            sys.stdout.write("Baseline was recorded with a different scale\n")
+            sys.exit(1)
+        if not compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Build hook compiling the templates shipped with the wheel."""
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+from pathlib import Path
+
+import importlib.util
+import shutil
+import tempfile
+
+
+class CustomBuildHook(BuildHookInterface):
+    def initialize(self, version: str, build_data: dict) -> None:
+        # editable installs use the source templates
+        if self.target_name != "wheel" or version == "editable":
+            return
+        path = Path(self.root) / "src" / "mxmake" / "environment.py"
+        spec = importlib.util.spec_from_file_location("mxmake_environment", path)
+        environment = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(environment)
+        self.compiled = Path(tempfile.mkdtemp())
+        environment.compile_templates(self.compiled)
+        build_data["force_include"][str(self.compiled)] = "mxmake/compiled_templates"
+
+    def finalize(self, version: str, build_data: dict, artifact_path: str) -> None:
+        compiled = getattr(self, "compiled", None)
+        if compiled is not None:
+            shutil.rmtree(compiled)
@@ -0,0 +1,4 @@
+from mxmake.main import main
+
+
+main()
@@ -0,0 +1,43 @@
+"""Template environment options and ahead of time compilation of templates.
+
+This module must only depend on ``jinja2``. It is loaded by the build hook to
+compile the templates shipped with the wheel.
+"""
+
+from jinja2 import Environment
+from jinja2 import FileSystemLoader
+from pathlib import Path
+
+import jinja2
+
+
+TEMPLATES_DIRECTORY = Path(__file__).parent / "templates"
+COMPILED_TEMPLATES_DIRECTORY = Path(__file__).parent / "compiled_templates"
+JINJA_VERSION_FILE = "jinja-version.txt"
+
+ENVIRONMENT_OPTIONS = {
+    "trim_blocks": True,
+    "keep_trailing_newline": True,
+}
+
+
+def compile_templates(target: Path) -> None:
+    """Compile all templates to python modules in target folder."""
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIRECTORY), **ENVIRONMENT_OPTIONS
+    )
+    target.mkdir(parents=True, exist_ok=True)
+    environment.compile_templates(str(target), zip=None, ignore_errors=False)
+    (target / JINJA_VERSION_FILE).write_text(jinja2.__version__)
+
+
+def compiled_templates(directory: Path = COMPILED_TEMPLATES_DIRECTORY) -> Path | None:
+    """Folder containing compiled templates. Return ``None`` if templates have
+    not been compiled, like in development checkouts, or if they were compiled
+    by another ``jinja2`` version.
+    """
+    try:
+        version = (directory / JINJA_VERSION_FILE).read_text()
+    except OSError:
+        return None
+    return directory if version == jinja2.__version__ else None
@@ -1,24 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from mxmake._version import __version__
 from mxmake.templates import get_template_environment
+from mxmake.templates import Template
 from mxmake.templates import template
+from mxmake.templates import WriteStats
+from mxmake.utils import ADDITIONAL_SOURCES_TARGETS
+from mxmake.utils import file_hash
 from mxmake.utils import list_value
+from mxmake.utils import mxmake_files
 from mxmake.utils import NAMESPACE
 from mxmake.utils import ns_name
 from pathlib import Path
 
+import json
 import logging
 import mxdev
+import os
+import time
+import typing
 
 
 logger = logging.getLogger("mxmake")
 
 
-ADDITIONAL_SOURCES_TARGETS = [
-    "constraints.txt",
-    "pyproject.toml",
-    "requirements.txt",
-    "setup.cfg",
-    "setup.py",
-]
+class Manifest:
+    """Input fingerprints and output hashes of templates written by the hook.
+
+    A template is skipped if its inputs did not change and its output file
+    still has the recorded hash. Only entries of templates written or
+    skipped in the current run are saved.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[str, dict[str, str]] = {}
+        self.current: dict[str, dict[str, str]] = {}
+        try:
+            with path.open() as fd:
+                data = json.load(fd)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == __version__:
+            self.entries = data["templates"]
+
+    def unchanged(self, instance: Template, fingerprint: str | None) -> bool:
+        entry = self.entries.get(instance.name)
+        if not entry or fingerprint is None or entry["inputs"] != fingerprint:
+            return False
+        target_path = instance.target_folder / instance.target_name
+        return entry["target"] == str(target_path) and entry["output"] == file_hash(
+            target_path
+        )
+
+    def update(self, instance: Template, fingerprint: str | None) -> None:
+        if fingerprint is None:
+            return
+        stats = instance.write_stats
+        self.current[instance.name] = {
+            "target": str(instance.target_folder / instance.target_name),
+            "inputs": fingerprint,
+            "output": stats.digest if stats else self.entries[instance.name]["output"],
+        }
+
+    def save(self) -> None:
+        """Atomically write manifest to file system."""
+        data = {"version": __version__, "templates": self.current}
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w") as fd:
+                json.dump(data, fd, indent=2, sort_keys=True)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning(f"mxmake: Cannot write manifest: {e!s}")
+
+
+def additional_sources_files(path: Path) -> list[str]:
+    """Files of source package which require reinstalling it on change."""
+    try:
+        with os.scandir(path) as entries:
+            return sorted(
+                entry.path
+                for entry in entries
+                if entry.name in ADDITIONAL_SOURCES_TARGETS and entry.is_file()
+            )
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def fingerprint_template(instance: Template) -> str | None:
+    """Fingerprint template. Return ``None`` if template variables cannot be
+    computed, the error is reported when writing the template.
+    """
+    try:
+        return instance.fingerprint()
+    except Exception:
+        return None
+
+
+def write_template(instance: Template) -> bool | Exception:
+    """Write template. Return exception instead of raising it."""
+    try:
+        return instance.write()
+    except Exception as e:
+        return e
 
 
 class Hook(mxdev.Hook):
@@ -26,6 +112,24 @@ class Hook(mxdev.Hook):
 
     def __init__(self) -> None:
         logger.info("mxmake: hook initialized")
+        self.stats: dict[str, dict[str, typing.Any]] = {}
+        self.manifest: Manifest | None = None
+
+    def template_workers(self, config: mxdev.Configuration) -> int | None:
+        """Number of threads rendering templates. ``None`` means the default
+        of ``ThreadPoolExecutor``.
+        """
+        value = config.settings.get(ns_name("template-workers"))
+        if not value:
+            return None
+        try:
+            workers = int(value)
+        except ValueError:
+            workers = 0
+        if workers < 1:
+            logger.warning(f"mxmake: Invalid number of template workers '{value}'")
+            return None
+        return workers
 
     def generate_templates(self, state: mxdev.State):
         config = state.configuration
@@ -34,33 +138,177 @@ class Hook(mxdev.Hook):
             logger.info("mxmake: No templates defined")
             return
         environment = get_template_environment()
+        instances: list[Template] = []
+        errors = []
+        targets: dict[Path, str] = {}
+        lookups: dict[str, float] = {}
         for name in templates:
+            start = time.perf_counter()
             try:
                 factory = template.lookup(name, bound=True)
             except RuntimeError as e:
                 msg = f"mxmake: {e!s}"
                 logger.warning(msg)
                 continue
-            factory(config, environment).write()
+            instance = factory(config, environment)
+            target_path = instance.target_folder / instance.target_name
+            lookups[name] = time.perf_counter() - start
+            if target_path in targets:
+                errors.append(
+                    f"Template '{name}' and template '{targets[target_path]}' "
+                    f"both generate '{target_path}'"
+                )
+                continue
+            targets[target_path] = name
+            instances.append(instance)
+        fingerprints = {
+            instance.name: fingerprint_template(instance) if self.manifest else None
+            for instance in instances
+        }
+        pending = [
+            instance
+            for instance in instances
+            if not self.manifest
+            or not self.manifest.unchanged(instance, fingerprints[instance.name])
+        ]
+        workers = self.template_workers(config)
+        if workers == 1 or len(pending) < 2:
+            written = [write_template(instance) for instance in pending]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                written = list(executor.map(write_template, pending))
+        results = {
+            instance.name: result
+            for instance, result in zip(pending, written, strict=True)
+        }
+        # log in order of configured templates
+        for instance in instances:
+            result = results.get(instance.name)
+            self.record_stats(instance, lookups[instance.name], result)
+            if isinstance(result, Exception):
+                errors.append(f"Template '{instance.name}' failed: {result!s}")
+                continue
+            if result:
+                target_path = instance.target_folder / instance.target_name
+                logger.info(f"mxmake: Generated '{target_path}'")
+            if self.manifest:
+                self.manifest.update(instance, fingerprints[instance.name])
+        if not errors:
+            return
+        for error in errors:
+            logger.error(f"mxmake: {error}")
+        raise RuntimeError(f"mxmake: Generating {len(errors)} template(s) failed")
 
     def generate_additional_sources_targets(self, state: mxdev.State):
         config = state.configuration
-        additional_sources_targets = []
-        sources_folder = Path(config.settings.get("default-target", "sources"))
-        for package_name in config.packages:
-            source_folder = sources_folder / package_name
+        default_target = config.settings.get("default-target", "sources")
+        packages = []
+        for name, package in config.packages.items():
+            install_mode = package.get("install-mode", "editable")
+            if install_mode == "skip":
+                continue
+            path = Path(
+                package.get("path")
+                or Path(package.get("target", default_target)) / name
+            )
+            if package.get("subdirectory"):
+                path /= package["subdirectory"]
+            files = additional_sources_files(path)
             # case new source package has been added to mx.ini
-            if not source_folder.exists():
+            if not files:
                 continue
-            for child in source_folder.iterdir():
-                if child in ADDITIONAL_SOURCES_TARGETS:
-                    additional_sources_targets.append(source_folder / child)
-        if not additional_sources_targets:
-            return
+            packages.append(
+                {
+                    "name": name,
+                    "files": files,
+                    "stamp": str(mxmake_files() / "packages" / f"{name}.stamp"),
+                }
+            )
         environment = get_template_environment()
         factory = template.lookup("additional_sources_targets")
-        factory(additional_sources_targets, environment).write()
+        if not packages:
+            factory(packages, environment).remove()
+            return
+        # packages get installed after running the hook, stamps of new source
+        # packages must be newer than their files to prevent reinstalling them.
+        # Existing stamps are touched by their targets if package files changed.
+        for package in packages:
+            stamp = Path(package["stamp"])
+            if not stamp.exists():
+                stamp.parent.mkdir(parents=True, exist_ok=True)
+                stamp.touch()
+        start = time.perf_counter()
+        instance = factory(packages, environment)
+        lookup = time.perf_counter() - start
+        fingerprint = fingerprint_template(instance) if self.manifest else None
+        if self.manifest and self.manifest.unchanged(instance, fingerprint):
+            self.record_stats(instance, lookup, None)
+            self.manifest.update(instance, fingerprint)
+            return
+        result = write_template(instance)
+        self.record_stats(instance, lookup, result)
+        if isinstance(result, Exception):
+            raise result
+        if self.manifest:
+            self.manifest.update(instance, fingerprint)
+
+    def record_stats(
+        self, instance: Template, lookup: float, result: bool | Exception | None
+    ) -> None:
+        """Record timings in seconds and written bytes of template. Result is
+        ``None`` if the template was skipped.
+        """
+        stats = instance.write_stats or WriteStats()
+        self.stats[instance.name] = {
+            "lookup": lookup,
+            "render": stats.render,
+            "write": stats.write,
+            "bytes": stats.size,
+            "changed": result is True,
+            "skipped": result is None,
+            "failed": isinstance(result, Exception),
+        }
+
+    def report_stats(self, total: float) -> None:
+        """Log summary of recorded stats. Additionally write them as JSON to
+        the file defined by ``MXMAKE_HOOK_STATS`` environment variable.
+        """
+        stats = self.stats.values()
+        summary = {
+            "total": total,
+            "written": sum(entry["changed"] for entry in stats),
+            "skipped": sum(entry["skipped"] for entry in stats),
+            "failed": sum(entry["failed"] for entry in stats),
+            "bytes": sum(entry["bytes"] for entry in stats),
+        }
+        summary["unchanged"] = (
+            len(stats) - summary["written"] - summary["skipped"] - summary["failed"]
+        )
+        logger.info(
+            f"mxmake: Hook took {total * 1000:.1f} ms for {len(self.stats)} "
+            f"template(s): {summary['written']} written, "
+            f"{summary['unchanged']} unchanged, {summary['skipped']} skipped, "
+            f"{summary['failed']} failed, "
+            f"{summary['bytes']} bytes"
+        )
+        path = os.environ.get("MXMAKE_HOOK_STATS")
+        if not path:
+            return
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with Path(path).open("w") as f:
+                json.dump({**summary, "templates": self.stats}, f, indent=2)
+        except OSError as e:
+            logger.warning(f"mxmake: Cannot write hook stats: {e!s}")
 
     def write(self, state: mxdev.State) -> None:
-        self.generate_templates(state)
-        self.generate_additional_sources_targets(state)
+        self.stats = {}
+        self.manifest = Manifest(mxmake_files() / "manifest.json")
+        start = time.perf_counter()
+        try:
+            self.generate_templates(state)
+            self.generate_additional_sources_targets(state)
+        finally:
+            self.manifest.save()
+            self.manifest = None
+            self.report_stats(time.perf_counter() - start)
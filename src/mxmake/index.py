@@ -0,0 +1,104 @@
+from mxmake._version import __version__
+from mxmake.utils import mxmake_cache
+from pathlib import Path
+
+import atexit
+import functools
+import json
+import os
+import typing
+
+
+class MetadataIndex:
+    """Persistent index of precompiled topic and domain metadata.
+
+    Entries are keyed by kind and path of the file they were computed from and
+    are validated against the modification time and size of that file, thus
+    changed files are parsed again while unchanged ones are served from the
+    index without being opened.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.dirty = False
+        self._entries: dict[str, dict[str, typing.Any]] | None = None
+
+    @property
+    def entries(self) -> dict[str, dict[str, typing.Any]]:
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if self.path is None:
+            return self._entries
+        try:
+            with self.path.open() as fd:
+                self._entries = json.load(fd)
+        except (OSError, ValueError):
+            pass
+        return self._entries
+
+    @staticmethod
+    def fingerprint(path: Path) -> list[int] | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(
+        self,
+        kind: str,
+        path: Path,
+        fingerprint: list[int] | None = None,
+    ) -> typing.Any | None:
+        """Return indexed value for path or ``None`` if missing or outdated.
+
+        ``fingerprint`` of path gets computed if not given.
+        """
+        entry = self.entries.get(f"{kind}:{path}")
+        if entry is None:
+            return None
+        if fingerprint is None:
+            fingerprint = self.fingerprint(path)
+        if entry["fingerprint"] != fingerprint:
+            return None
+        return entry["value"]
+
+    def set(self, kind: str, path: Path, value: typing.Any) -> None:
+        """Store value computed from path. Index gets saved on exit."""
+        self.entries[f"{kind}:{path}"] = {
+            "fingerprint": self.fingerprint(path),
+            "value": value,
+        }
+        if self.path is not None and not self.dirty:
+            atexit.register(self.save)
+        self.dirty = True
+
+    def save(self) -> None:
+        """Atomically write index to file system if changed."""
+        if self.path is None or not self.dirty:
+            return
+        # drop entries of files which no longer exist
+        entries = {
+            key: entry
+            for key, entry in self.entries.items()
+            if Path(key.split(":", 1)[1]).exists()
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w") as fd:
+                json.dump(entries, fd)
+            tmp_path.replace(self.path)
+        except OSError:
+            # the index is a pure optimization, never fail because of it
+            tmp_path.unlink(missing_ok=True)
+            return
+        self.dirty = False
+
+
+@functools.lru_cache(maxsize=1)
+def get_metadata_index() -> MetadataIndex:
+    """Return process wide metadata index for the installed mxmake version."""
+    cache = mxmake_cache()
+    return MetadataIndex(cache / f"index-{__version__}.json" if cache else None)
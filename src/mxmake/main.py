@@ -1,33 +1,29 @@
 from ._version import __version__
 from .helpgen import print_help
 from .parser import MakefileParser
-from .templates import ci_template
-from .templates import get_template_environment
-from .templates import template
 from .topics import collect_missing_dependencies
 from .topics import Domain
 from .topics import get_domain
+from .topics import get_registry
 from .topics import get_topic
 from .topics import load_topics
 from .topics import resolve_domain_dependencies
 from .topics import set_domain_runtime_depends
+from .utils import mxmake_files
 from operator import attrgetter
 from pathlib import Path
 from textwrap import indent
 
 import argparse
-import inquirer
 import logging
-import mxdev
 import sys
 import typing
-import yaml
 
 
 logger = logging.getLogger("mxmake")
 
 
-parser = argparse.ArgumentParser()
+parser = argparse.ArgumentParser(prog="mxmake")
 parser.add_argument(
     "-v",
     "--version",
@@ -42,7 +38,40 @@ command_parsers = parser.add_subparsers(dest="command", required=True)
 ##############################################################################
 
 
+def list_dependencies(fqn: str, reverse: bool):
+    try:
+        get_domain(fqn)
+    except (AttributeError, ValueError):
+        sys.stdout.write(f"Requested domain not found: {fqn}\n")
+        sys.exit(1)
+    dependencies = get_registry().dependencies
+    if reverse:
+        sys.stdout.write(f"Domains depending on {fqn}:\n")
+        hard = dependencies.required_by(fqn)
+        soft = dependencies.soft_required_by(fqn)
+    else:
+        sys.stdout.write(f"Domains required by {fqn}:\n")
+        hard = dependencies.depends(fqn)
+        soft = dependencies.soft_depends(fqn)
+    for title, fqns in (("Hard", hard), ("Soft", soft)):
+        sys.stdout.write(f"  {title}:")
+        if not fqns:
+            sys.stdout.write(" None\n")
+            continue
+        sys.stdout.write("\n")
+        for name in sorted(fqns):
+            sys.stdout.write(f"    - {name}\n")
+
+
 def list_command(args: argparse.Namespace):
+    if args.depends_on:
+        list_dependencies(args.depends_on, reverse=True)
+        return
+
+    if args.required_by:
+        list_dependencies(args.required_by, reverse=False)
+        return
+
     if not args.topic:
         topics = load_topics()
         sys.stdout.write("Topics:\n")
@@ -99,6 +128,16 @@ list_parser = command_parsers.add_parser("list", help="List stuff")
 list_parser.set_defaults(func=list_command)
 list_parser.add_argument("-t", "--topic", help="Topic name")
 list_parser.add_argument("-d", "--domain", help="Domain name")
+list_parser.add_argument(
+    "--depends-on",
+    metavar="FQN",
+    help="List domains depending on domain with given full qualified name",
+)
+list_parser.add_argument(
+    "--required-by",
+    metavar="FQN",
+    help="List domains required by domain with given full qualified name",
+)
 
 
 ##############################################################################
@@ -107,6 +146,14 @@ list_parser.add_argument("-d", "--domain", help="Domain name")
 
 
 def create_config(prompt: bool, preseeds: dict[str, typing.Any] | None):
+    # prompting and rendering machinery is only needed here, defer imports to
+    # keep startup of other commands fast
+    from .templates import ci_template
+    from .templates import get_template_environment
+    from .templates import template
+
+    import inquirer
+
     if prompt and preseeds:
         sys.stdout.write("Either use prompt or preseeds, not both\n")
         sys.exit(1)
@@ -230,9 +277,14 @@ def create_config(prompt: bool, preseeds: dict[str, typing.Any] | None):
         # generate makefile
         factory = template.lookup("makefile")
         makefile_template = factory(
-            target_folder, domains, domain_settings, get_template_environment()
+            target_folder,
+            domains,
+            domain_settings,
+            get_template_environment(),
+            existing=parser.model,
         )
-        makefile_template.write()
+        if not makefile_template.write():
+            sys.stdout.write("Makefile is up to date, skip writing\n")
     else:
         sys.stdout.write("Skip generation of Makefile, nothing selected\n")
 
@@ -302,6 +354,9 @@ def auto_detect_project_path_python() -> str | None:
 
 
 def init_command(args: argparse.Namespace):
+    import inquirer
+    import yaml
+
     sys.stdout.write("\n#######################\n")
     sys.stdout.write("# mxmake initialization\n")
     sys.stdout.write("#######################\n\n")
@@ -388,12 +443,70 @@ help_generator_parser = command_parsers.add_parser(
 )
 help_generator_parser.set_defaults(func=help_generator_command)
 
+
+##############################################################################
+# install-packages
+##############################################################################
+
+
+def install_packages_command(args: argparse.Namespace):
+    from .packages import install_packages
+
+    requirements = Path(args.requirements)
+    if not requirements.exists():
+        sys.stdout.write(f"{requirements} does not exist, abort\n")
+        sys.exit(1)
+
+    sys.exit(
+        install_packages(
+            requirements,
+            Path(args.state),
+            Path(args.installed),
+            args.installer,
+            args.install_options,
+        )
+    )
+
+
+install_packages_parser = command_parsers.add_parser(
+    "install-packages",
+    help="Install packages changed since the last run",
+)
+install_packages_parser.set_defaults(func=install_packages_command)
+install_packages_parser.add_argument(
+    "requirements",
+    nargs="?",
+    default="requirements-mxdev.txt",
+    help="Requirements file generated by mxdev",
+)
+install_packages_parser.add_argument(
+    "--installer",
+    default="python -m pip",
+    help="Package installer command",
+)
+install_packages_parser.add_argument(
+    "--install-options",
+    default="",
+    help="Additional options passed to the installer, e.g. '--install-options=--pre'",
+)
+install_packages_parser.add_argument(
+    "--state",
+    default=str(mxmake_files() / "packages.json"),
+    help="State file recording the requirements of the last run",
+)
+install_packages_parser.add_argument(
+    "--installed",
+    default=str(mxmake_files() / "installed.txt"),
+    help="Record of installed packages",
+)
+
 ##############################################################################
 # main
 ##############################################################################
 
 
 def main() -> None:
-    mxdev.setup_logger(logging.INFO)
+    # same logging setup as ``mxdev.setup_logger`` without importing mxdev
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout, format="%(message)s")
     args = parser.parse_args()
     args.func(args)
@@ -0,0 +1,274 @@
+"""Incremental installation of the packages of mxdev generated requirements.
+
+The requirements and constraints of the last successful installation are
+recorded in a state file. On the next run only added or changed requirements
+are installed, installed packages whose constraints changed get updated and
+local source packages get reinstalled if one of their files, like
+``pyproject.toml`` or ``setup.py``, changed.
+Options of the requirements file, installer or install options changing,
+as well as a missing state or installed record, result in a full install.
+"""
+
+from dataclasses import dataclass
+from dataclasses import field
+from importlib import metadata
+from mxmake.utils import ADDITIONAL_SOURCES_TARGETS
+from mxmake.utils import file_hash
+from pathlib import Path
+
+import importlib
+import json
+import logging
+import os
+import re
+import shlex
+import subprocess
+import tempfile
+
+
+logger = logging.getLogger("mxmake")
+
+# Format version of the state file.
+STATE_VERSION = 2
+
+REQUIREMENT_NAME = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?=$|[\[(<>=!~;@\s])")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize distribution name as described in PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def requirement_name(line: str) -> str | None:
+    """Normalized distribution name of a requirement line or ``None`` if line
+    refers to a path or URL.
+    """
+    match = REQUIREMENT_NAME.match(line)
+    return normalize_name(match.group(1)) if match else None
+
+
+def source_path(line: str) -> str | None:
+    """Path of local source package requirement line or ``None`` if line
+    refers to a named requirement or URL.
+    """
+    line = re.sub(r"^(-e|--editable)[\s=]*", "", line)
+    if requirement_name(line) or "://" in line:
+        return None
+    return re.sub(r"\[[^\]]*\]$", "", line.split(";")[0].strip())
+
+
+def source_files(path: Path) -> dict[str, str]:
+    """Hashes of files of source package which require reinstalling it."""
+    hashes = {}
+    for name in ADDITIONAL_SOURCES_TARGETS:
+        digest = file_hash(path / name)
+        if digest:
+            hashes[name] = digest
+    return hashes
+
+
+def read_lines(path: Path) -> list[str]:
+    """Read requirement lines of file without comments and blank lines, with
+    backslash continuations joined.
+    """
+    lines = []
+    current = ""
+    with path.open() as f:
+        for line in f:
+            line = re.sub(r"(^|\s)#.*$", "", line.rstrip("\n")).strip()
+            if line.endswith("\\"):
+                current += line[:-1]
+                continue
+            line = (current + line).strip()
+            current = ""
+            if line:
+                lines.append(line)
+    if current.strip():
+        lines.append(current.strip())
+    return lines
+
+
+@dataclass
+class Requirements:
+    """Requirements file as generated by mxdev."""
+
+    #: Global options, e.g. index URLs.
+    options: list[str] = field(default_factory=list)
+    #: Constraints file references as written in the requirements file.
+    constraints_refs: list[str] = field(default_factory=list)
+    #: Requirement lines including editable sources.
+    requirements: list[str] = field(default_factory=list)
+    #: Constraint lines by normalized distribution name.
+    constraints: dict[str, list[str]] = field(default_factory=dict)
+    #: File hashes of local source packages by requirement line.
+    sources: dict[str, dict[str, str]] = field(default_factory=dict)
+
+    @classmethod
+    def read(cls, path: Path) -> "Requirements":
+        result = cls()
+        for line in read_lines(path):
+            if line.startswith("-c") or line.startswith("--constraint"):
+                ref = re.sub(r"^(-c|--constraint)[\s=]*", "", line)
+                result.constraints_refs.append(ref)
+                constraints_path = path.parent / ref
+                if not constraints_path.exists():
+                    continue
+                for constraint in read_lines(constraints_path):
+                    name = requirement_name(constraint)
+                    if name:
+                        result.constraints.setdefault(name, []).append(constraint)
+            elif line.startswith("-") and not line.startswith(("-e", "--editable")):
+                result.options.append(line)
+            else:
+                result.requirements.append(line)
+                source = source_path(line)
+                if source is not None:
+                    result.sources[line] = source_files(path.parent / source)
+        return result
+
+
+def installed_distributions() -> dict[str, str]:
+    """Versions of installed distributions by normalized name."""
+    importlib.invalidate_caches()
+    distributions = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            distributions.setdefault(normalize_name(name), dist.version)
+    return distributions
+
+
+def plan(
+    state: dict | None,
+    requirements: Requirements,
+    installer: list[str],
+    options: list[str],
+    installed: dict[str, str],
+) -> list[str] | None:
+    """Requirement lines to install or ``None`` if a full install is needed."""
+    if (
+        state is None
+        or state.get("version") != STATE_VERSION
+        or state.get("installer") != installer
+        or state.get("install_options") != options
+        or state.get("options") != requirements.options
+        or state.get("constraints_refs") != requirements.constraints_refs
+    ):
+        return None
+    previous = set(state.get("requirements", []))
+    old_sources = state.get("sources", {})
+    # new requirements and source packages with changed files
+    result = [
+        line
+        for line in requirements.requirements
+        if line not in previous
+        or (
+            line in requirements.sources
+            and requirements.sources[line] != old_sources.get(line)
+        )
+    ]
+    by_name = {requirement_name(line): line for line in requirements.requirements}
+    old_constraints = state.get("constraints", {})
+    for name in sorted(requirements.constraints.keys() | old_constraints.keys()):
+        if requirements.constraints.get(name) == old_constraints.get(name):
+            continue
+        line = by_name.get(name)
+        if line is None and name in installed:
+            # constrained dependency of another package
+            line = name
+        if line is not None and line not in result:
+            result.append(line)
+    return result
+
+
+def read_state(path: Path) -> dict | None:
+    try:
+        with path.open() as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    tmp.replace(path)
+
+
+def write_installed(path: Path, distributions: dict[str, str]) -> None:
+    """Write record of installed distributions in ``pip freeze`` format."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        for name, version in sorted(distributions.items()):
+            f.write(f"{name}=={version}\n")
+
+
+def run_installer(
+    installer: list[str], options: list[str], requirements_file: Path
+) -> int:
+    command = [*installer, "install", *options, "-r", str(requirements_file)]
+    return subprocess.run(command, check=False).returncode
+
+
+def install_packages(
+    requirements_file: Path,
+    state_file: Path,
+    installed_file: Path,
+    installer: str,
+    install_options: str = "",
+) -> int:
+    """Install packages of requirements file, only installing requirements
+    changed since the last run. Return exit code of the installer.
+    """
+    installer_args = shlex.split(installer)
+    options = shlex.split(install_options)
+    requirements = Requirements.read(requirements_file)
+    state = read_state(state_file) if installed_file.exists() else None
+    installed = installed_distributions()
+    lines = plan(state, requirements, installer_args, options, installed)
+    if lines is None:
+        logger.info("Install all python packages")
+        returncode = run_installer(installer_args, options, requirements_file)
+    elif not lines:
+        logger.info("Python packages are up to date")
+        returncode = 0
+    else:
+        logger.info(f"Install {len(lines)} changed requirement(s)")
+        # written next to the requirements file, relative paths and
+        # constraints references resolve the same
+        fd, name = tempfile.mkstemp(
+            prefix=".requirements-", suffix=".txt", dir=requirements_file.parent
+        )
+        tmp = Path(name)
+        try:
+            with os.fdopen(fd, "w") as f:
+                for line in requirements.options:
+                    f.write(f"{line}\n")
+                for ref in requirements.constraints_refs:
+                    f.write(f"-c {ref}\n")
+                for line in lines:
+                    logger.info(f"-> {line}")
+                    f.write(f"{line}\n")
+            returncode = run_installer(installer_args, options, tmp)
+        finally:
+            tmp.unlink()
+    if returncode:
+        return returncode
+    write_json(
+        state_file,
+        {
+            "version": STATE_VERSION,
+            "installer": installer_args,
+            "install_options": options,
+            "options": requirements.options,
+            "constraints_refs": requirements.constraints_refs,
+            "requirements": requirements.requirements,
+            "constraints": requirements.constraints,
+            "sources": requirements.sources,
+        },
+    )
+    write_installed(installed_file, installed_distributions())
+    return 0
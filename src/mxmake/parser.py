@@ -1,6 +1,17 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
 from mxmake.topics import get_domain
 from pathlib import Path
 
+import re
+
+
+# Marks the end of the settings section in generated makefiles.
+SETTINGS_END = "# END SETTINGS"
+
+ASSIGNMENT = re.compile(r"^([^\s#:=?]+)\?=(.*)$")
+
 
 class SettingMissing(Exception):
     """Exception used in parser to indicate a missing setting in an existing
@@ -8,60 +19,189 @@ class SettingMissing(Exception):
     """
 
 
+@dataclass
+class Assignment:
+    """``NAME?=value`` assignment including its continuation lines."""
+
+    name: str
+    lines: list[str]
+
+    @property
+    def value(self) -> str:
+        first, *continuation = (line.rstrip() for line in self.lines)
+        value = first[len(self.name) + 2 :]
+        for line in continuation:
+            if line:
+                value += f"\n{line}"
+        return value
+
+
+@dataclass
+class SettingsGroup:
+    """Lines of the settings section belonging to one domain, starting with
+    the ``## fqn`` line. The group preceding the first domain has no fqn.
+    """
+
+    fqn: str | None
+    nodes: list[str | Assignment] = field(default_factory=list)
+
+    @property
+    def assignments(self) -> list[Assignment]:
+        return [node for node in self.nodes if isinstance(node, Assignment)]
+
+
+@dataclass
+class SettingsModel:
+    """Structured settings section of a makefile.
+
+    Keeps all lines including comments and blank lines, so the parsed file
+    can be written back unchanged with ``dumps``.
+    """
+
+    fqns: list[str] = field(default_factory=list)
+    groups: list[SettingsGroup] = field(default_factory=list)
+    body: list[str] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, lines: Iterable[str], body: bool = True) -> "SettingsModel":
+        """Parse lines of a makefile in a single pass.
+
+        If ``body`` is false, parsing stops at the ``END SETTINGS`` marker.
+        Otherwise the marker and all following lines are kept as body.
+        """
+        model = cls(groups=[SettingsGroup(None)])
+        group = model.groups[0]
+        assignment = None
+        for line in lines:
+            stripped = line.rstrip()
+            if assignment is not None:
+                assignment.lines.append(line)
+                if stripped and not stripped.endswith("\\"):
+                    assignment = None
+                continue
+            if model.body:
+                model.body.append(line)
+                continue
+            if stripped.startswith(SETTINGS_END):
+                if not body:
+                    break
+                model.body.append(line)
+                continue
+            if stripped.startswith("## "):
+                group = SettingsGroup(stripped[3:].strip(), [line])
+                model.groups.append(group)
+                continue
+            if stripped.startswith("#:"):
+                model.fqns.append(stripped[2:].strip())
+            match = ASSIGNMENT.match(stripped)
+            if not match:
+                group.nodes.append(line)
+                continue
+            node = Assignment(match.group(1), [line])
+            group.nodes.append(node)
+            if stripped.endswith("\\"):
+                assignment = node
+        return model
+
+    @property
+    def assignments(self) -> dict[str, str]:
+        """Values of all assignments by name. If a name is assigned multiple
+        times, the first assignment wins.
+        """
+        assignments: dict[str, str] = {}
+        for group in self.groups:
+            for assignment in group.assignments:
+                assignments.setdefault(assignment.name, assignment.value)
+        return assignments
+
+    def dumps(self) -> str:
+        lines = []
+        for group in self.groups:
+            for node in group.nodes:
+                if isinstance(node, Assignment):
+                    lines.extend(node.lines)
+                else:
+                    lines.append(node)
+        lines.extend(self.body)
+        return "".join(lines)
+
+    def equivalent(self, other: "SettingsModel") -> bool:
+        """Check whether both makefiles only differ in whitespace.
+
+        Domains, settings per domain, their values and the comments of the
+        settings section must match, while blank lines and trailing
+        whitespace are ignored. The body below the settings section must
+        match exactly.
+        """
+        return (
+            self.fqns == other.fqns
+            and self._settings() == other._settings()
+            and self.body == other.body
+        )
+
+    def _settings(self) -> list[tuple[str | None, list[str | tuple[str, str]]]]:
+        return [
+            (
+                group.fqn,
+                [
+                    (node.name, node.value)
+                    if isinstance(node, Assignment)
+                    else node.rstrip()
+                    for node in group.nodes
+                    if isinstance(node, Assignment) or node.strip()
+                ],
+            )
+            for group in self.groups
+        ]
+
+
+def tokenize(lines: Iterable[str]) -> tuple[list[str], dict[str, str]]:
+    """Walk lines of a makefile once and return the domain fqns and a dict of
+    all ``NAME?=value`` assignments in the settings section.
+
+    Blank lines are ignored. Values with backslash continuations include the
+    continuation lines separated by newlines. If a name is assigned multiple
+    times, the first assignment wins.
+    """
+    model = SettingsModel.parse(lines, body=False)
+    return model.fqns, model.assignments
+
+
 class MakefileParser:
     def __init__(self, path: Path):
         self.path = path
         self.fqns: list = []
         self.topics: dict = {}
         self.settings: dict = {}
+        self.assignments: dict = {}
+        self.model: SettingsModel | None = None
         self.parse()
 
-    def parse_fqns(self, lines: list[str]):
-        for line in lines:
-            if line.startswith("#:"):
-                fqn = line[2:].strip()
-                self.fqns.append(fqn)
-                topic, name = fqn.split(".")
-                self.topics.setdefault(topic, [])
-                self.topics[topic].append(name)
-
-    def parse_settings(self, lines: list[str]):
+    def parse_fqns(self, fqns: list[str]):
+        for fqn in fqns:
+            self.fqns.append(fqn)
+            topic, name = fqn.split(".")
+            self.topics.setdefault(topic, [])
+            self.topics[topic].append(name)
+
+    def parse_settings(self, assignments: dict[str, str]):
         for fqn in self.fqns:
             domain = get_domain(fqn)
             for setting in domain.settings:
-                try:
-                    value = self.parse_setting(lines, setting.name)
-                    self.settings[f"{fqn}.{setting.name}"] = value
-                except SettingMissing:
-                    continue
+                if setting.name in assignments:
+                    self.settings[f"{fqn}.{setting.name}"] = assignments[setting.name]
 
     def parse_setting(self, lines: list[str], name: str) -> str:
-        setting_missing = True
-        setting_scope = False
-        value = ""
-        for line in lines:
-            if setting_scope:
-                if line:
-                    value += f"\n{line}"
-                if line.endswith("\\"):
-                    continue
-                setting_scope = False
-                break
-            if line.startswith(f"{name}?="):
-                setting_missing = False
-                value = line[line.find("?=") + 2 :]
-                if value.endswith("\\"):
-                    setting_scope = True
-                    continue
-                break
-        if setting_missing:
+        assignments = tokenize(lines)[1]
+        if name not in assignments:
             raise SettingMissing(name)
-        return value
+        return assignments[name]
 
     def parse(self) -> None:
         if not self.path.exists():
             return
         with self.path.open() as fd:
-            lines = [line.rstrip() for line in fd.readlines() if line.strip()]
-            self.parse_fqns(lines)
-            self.parse_settings(lines)
+            self.model = SettingsModel.parse(fd)
+        self.assignments = self.model.assignments
+        self.parse_fqns(self.model.fqns)
+        self.parse_settings(self.assignments)
@@ -1,24 +1,69 @@
+from dataclasses import dataclass
+from jinja2 import BaseLoader
+from jinja2 import ChoiceLoader
 from jinja2 import Environment
+from jinja2 import FileSystemBytecodeCache
+from jinja2 import ModuleLoader
 from jinja2 import PackageLoader
+from mxmake._version import __version__
+from mxmake.environment import compiled_templates
+from mxmake.environment import ENVIRONMENT_OPTIONS
+from mxmake.parser import SettingsModel
 from mxmake.topics import Domain
 from mxmake.topics import get_topic
 from mxmake.topics import load_topics
+from mxmake.utils import content_hash
+from mxmake.utils import file_hash
 from mxmake.utils import gh_actions_path
+from mxmake.utils import mxmake_cache
 from mxmake.utils import mxmake_files
 from mxmake.utils import ns_name
 from pathlib import Path
 
 import abc
-import io
+import functools
+import hashlib
+import json
 import mxdev
+import os
+import stat
+import tempfile
+import time
 import typing
 
 
+def get_bytecode_cache() -> FileSystemBytecodeCache | None:
+    """Persistent cache for compiled templates of this mxmake version. Return
+    ``None`` if caching is disabled or the cache folder is not writable.
+    """
+    cache = mxmake_cache()
+    if cache is None:
+        return None
+    directory = cache / f"templates-{__version__}"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    if not os.access(directory, os.W_OK):
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+@functools.lru_cache(maxsize=1)
 def get_template_environment() -> Environment:
+    """Template environment shared by all templates.
+
+    Templates compiled while building the wheel are preferred, source
+    templates are used in development checkouts.
+    """
+    loader: BaseLoader = PackageLoader("mxmake", "templates")
+    compiled = compiled_templates()
+    if compiled is not None:
+        loader = ChoiceLoader([ModuleLoader(str(compiled)), loader])
     return Environment(
-        loader=PackageLoader("mxmake", "templates"),
-        trim_blocks=True,
-        keep_trailing_newline=True,
+        loader=loader,
+        bytecode_cache=get_bytecode_cache(),
+        **ENVIRONMENT_OPTIONS,
     )
 
 
@@ -47,9 +92,36 @@ class template:
         return factory
 
 
+@dataclass
+class WriteStats:
+    """Statistics of writing a template. Rendering is streamed while
+    writing, ``render`` is the time spent in the template and ``write`` the
+    time spent hashing and writing.
+    """
+
+    render: float = 0.0
+    write: float = 0.0
+    size: int = 0
+    changed: bool = False
+    digest: str = ""
+
+
+def _timed(chunks: typing.Iterable[str], stats: WriteStats) -> typing.Iterator[str]:
+    """Yield chunks and add the time needed to produce them to stats."""
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        chunk = next(iterator, None)
+        stats.render += time.perf_counter() - start
+        if chunk is None:
+            return
+        yield chunk
+
+
 class Template(abc.ABC):
     name: str
     file_mode: int = 0o644
+    write_stats: WriteStats | None = None
 
     def __init__(
         self,
@@ -78,17 +150,94 @@ class Template(abc.ABC):
     def template_variables(self) -> dict[str, typing.Any]:
         """Variables for template rendering."""
 
-    def write(self) -> None:
-        """Render template and write result to file system."""
+    def fingerprint(self) -> str:
+        """Hash of all inputs for rendering the template, which are the
+        mxmake version, template name and source, target path and template
+        variables.
+        """
+        if not self.environment:
+            raise RuntimeError("Cannot fingerprint template without environment")
+        try:
+            source = self.environment.loader.get_source(  # type: ignore
+                self.environment, self.template_name
+            )[0]
+        except RuntimeError:
+            # loader has no access to template sources, e.g. templates
+            # compiled at build time. They are covered by the version.
+            source = None
+        inputs = [
+            __version__,
+            self.template_name,
+            source,
+            str(self.target_folder / self.target_name),
+            self.template_variables,
+        ]
+        return content_hash(json.dumps(inputs, sort_keys=True, default=str).encode())
+
+    def render(self) -> str:
+        """Render template."""
+        return "".join(self.generate())
+
+    def generate(self) -> typing.Iterator[str]:
+        """Render template chunk by chunk."""
+        if not self.environment:
+            raise RuntimeError("Cannot render template without environment")
+        template = self.environment.get_template(self.template_name)
+        return template.generate(**self.template_variables)
+
+    def write(self) -> bool:
+        """Render template and write result to file system.
+
+        The template is streamed to a temporary file, which replaces the
+        target file only if it is not ``unchanged``. Return whether the file
+        has been written.
+        """
         if not self.environment:
             raise RuntimeError("Cannot write template without environment")
+        stats = self.write_stats = WriteStats()
+        start = time.perf_counter()
+        chunks = self.generate()
+        stats.render = time.perf_counter() - start
+        try:
+            stats.changed = self._write(_timed(chunks, stats), stats)
+        finally:
+            stats.write = time.perf_counter() - start - stats.render
+        return stats.changed
+
+    def _write(self, chunks: typing.Iterable[str], stats: WriteStats) -> bool:
         target_folder = self.target_folder
         target_folder.mkdir(parents=True, exist_ok=True)
         target_path = target_folder / self.target_name
-        template = self.environment.get_template(self.template_name)
-        with target_path.open("w") as f:
-            f.write(template.render(**self.template_variables))
-        target_path.chmod(self.file_mode)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=target_folder, prefix=f".{self.target_name}.", suffix=".tmp"
+        )
+        tmp_path = Path(tmp_name)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    data = chunk.encode()
+                    digest.update(data)
+                    f.write(data)
+                    stats.size += len(data)
+            stats.digest = digest.hexdigest()
+            if self.unchanged(tmp_path, stats.digest):
+                tmp_path.unlink()
+                if stat.S_IMODE(target_path.stat().st_mode) != self.file_mode:
+                    target_path.chmod(self.file_mode)
+                return False
+            tmp_path.chmod(self.file_mode)
+            tmp_path.replace(target_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return True
+
+    def unchanged(self, path: Path, digest: str) -> bool:
+        """Check whether rendered file at ``path`` with content hash ``digest``
+        is unchanged compared to the existing target file.
+        """
+        return file_hash(self.target_folder / self.target_name) == digest
 
     def remove(self) -> bool:
         """Remove rendered template if exists. Return bool if file existed."""
@@ -247,11 +396,16 @@ class Makefile(Template):
         domains: list[Domain],
         domain_settings: dict[str, str],
         environment: Environment | None = None,
+        existing: SettingsModel | None = None,
     ) -> None:
+        """``existing`` is the settings model of the existing Makefile. If
+        given, the Makefile is not written if it only differs in whitespace.
+        """
         super().__init__(environment)
         self.target_folder = target_folder
         self.domains = domains
         self.domain_settings = domain_settings
+        self.existing = existing
 
     @property
     def template_variables(self) -> dict[str, typing.Any]:
@@ -272,12 +426,6 @@ class Makefile(Template):
                         "value": self.domain_settings.get(sfqn, setting.default),
                     }
                 )
-        # render domain sections
-        sections = io.StringIO()
-        for domain in self.domains:
-            sections.write("\n")
-            domain.write_to(sections)
-        sections.seek(0)
         # collect fqns of used domains
         fqns = sorted([domain.fqn for domain in self.domains])
         additional_targets = {}
@@ -286,11 +434,35 @@ class Makefile(Template):
         # return template variables
         return {
             "settings": settings,
-            "sections": sections,
+            "sections": self.sections(),
             "fqns": fqns,
             "additional_targets": additional_targets,
         }
 
+    def unchanged(self, path: Path, digest: str) -> bool:
+        if super().unchanged(path, digest):
+            return True
+        if self.existing is None:
+            return False
+        with path.open() as f:
+            return self.existing.equivalent(SettingsModel.parse(f))
+
+    def sections(self) -> typing.Iterator[str]:
+        """Stream domain sections from their files, each followed by the
+        settings fingerprint of the domain.
+        """
+        for domain in self.domains:
+            yield "\n"
+            digest = hashlib.sha256()
+            for line in domain.read_body():
+                digest.update(line.encode())
+                yield line
+            names = " ".join(setting.name for setting in domain.settings)
+            yield (
+                f"\n$(call settings_fingerprint,{domain.fqn},"
+                f"{digest.hexdigest()[:16]},{names})\n"
+            )
+
 
 ##############################################################################
 # additional sources targets
@@ -305,11 +477,15 @@ class AdditionalSourcesTargets(Template):
 
     def __init__(
         self,
-        additional_sources_targets: list[str],
+        packages: list[dict[str, typing.Any]],
         environment: Environment | None = None,
     ) -> None:
+        """``packages`` is a list of dicts containing ``name``, ``files``
+        which require reinstalling the package on change and the ``stamp``
+        file of the package.
+        """
         super().__init__(environment)
-        self.additional_sources_targets = additional_sources_targets
+        self.packages = packages
 
     @property
     def target_folder(self) -> Path:
@@ -317,7 +493,12 @@ class AdditionalSourcesTargets(Template):
 
     @property
     def template_variables(self) -> dict[str, typing.Any]:
-        return {"additional_sources_targets": self.additional_sources_targets}
+        return {
+            "additional_sources_targets": [
+                file for package in self.packages for file in package["files"]
+            ],
+            "packages": self.packages,
+        }
 
 
 ##############################################################################
@@ -391,13 +572,7 @@ class Topics(Template):
         topics = sorted(topics, key=lambda t: (t.name != "core", t.name))
         return {"topics": topics}
 
-    def render(self):
-        if not self.environment:
-            raise RuntimeError("Cannot write template without environment")
-        template = self.environment.get_template(self.template_name)
-        return template.render(**self.template_variables)
-
-    def write(self) -> None:
+    def write(self) -> bool:
         raise NotImplementedError(
             "Topics template is not supposed to be written to file system"
         )
@@ -422,13 +597,7 @@ class Dependencies(Template):
         topics = sorted(topics, key=lambda t: (t.name != "core", t.name))
         return {"topics": topics}
 
-    def render(self):
-        if not self.environment:
-            raise RuntimeError("Cannot write template without environment")
-        template = self.environment.get_template(self.template_name)
-        return template.render(**self.template_variables)
-
-    def write(self) -> None:
+    def write(self) -> bool:
         raise NotImplementedError(
             "Dependencies template is not supposed to be written to file system"
         )
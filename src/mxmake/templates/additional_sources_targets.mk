@@ -1 +1,9 @@
 ADDITIONAL_SOURCES_TARGETS=$(wildcard {{ " ".join(additional_sources_targets) }})
+{% for package in packages %}
+
+# {{ package.name }}
+ADDITIONAL_SOURCES_PACKAGE_TARGETS+={{ package.stamp }}
+{{ package.stamp }}: $(wildcard {{ " ".join(package.files) }})
+	@echo "Files of package {{ package.name }} changed"
+	@touch {{ package.stamp }}
+{% endfor %}
@@ -1,8 +1,21 @@
+import atexit
+import os
+import shutil
+import tempfile
 import unittest
 
 
+# keep caches written by tests out of the cache folder of the user
+_cache = tempfile.mkdtemp(prefix="mxmake-test-cache-")
+atexit.register(shutil.rmtree, _cache, ignore_errors=True)
+os.environ["MXMAKE_CACHE"] = _cache
+
+
 def test_suite():
     from mxmake.tests import test_hook
+    from mxmake.tests import test_index
+    from mxmake.tests import test_main
+    from mxmake.tests import test_packages
     from mxmake.tests import test_parser
     from mxmake.tests import test_templates
     from mxmake.tests import test_topics
@@ -11,6 +24,9 @@ def test_suite():
     suite = unittest.TestSuite()
 
     suite.addTest(unittest.findTestCases(test_hook))
+    suite.addTest(unittest.findTestCases(test_index))
+    suite.addTest(unittest.findTestCases(test_main))
+    suite.addTest(unittest.findTestCases(test_packages))
     suite.addTest(unittest.findTestCases(test_parser))
     suite.addTest(unittest.findTestCases(test_templates))
     suite.addTest(unittest.findTestCases(test_topics))
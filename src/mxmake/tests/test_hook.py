@@ -1,7 +1,14 @@
+from jinja2 import DictLoader
+from jinja2 import Environment
 from mxmake import hook
+from mxmake import templates
 from mxmake import testing
+from mxmake import utils
+from unittest import mock
 
+import json
 import mxdev
+import os
 import unittest
 
 
@@ -18,5 +25,264 @@ class TestHook(unittest.TestCase):
         hook_.write(state)
         self.assertEqual(
             [entry.name for entry in sorted(tempdir.iterdir())],
-            ["mx.ini", "run-coverage.sh", "run-tests.sh"],
+            ["manifest.json", "mx.ini", "run-coverage.sh", "run-tests.sh"],
         )
+
+    @testing.template_directory()
+    def test_Hook_stats(self, tempdir):
+        mxini = tempdir / "mx.ini"
+        with mxini.open("w") as fd:
+            fd.write("[settings]\nmxmake-templates = run-tests run-coverage")
+        hook_ = hook.Hook()
+        configuration = mxdev.Configuration(mxini, hooks=[hook_])
+        state = mxdev.State(configuration=configuration)
+        stats_path = tempdir / "stats" / "hook.json"
+        os.environ["MXMAKE_HOOK_STATS"] = str(stats_path)
+        try:
+            with self.assertLogs("mxmake") as logs:
+                hook_.write(state)
+            self.assertRegex(
+                logs.output[-1],
+                r"mxmake: Hook took \d+\.\d ms for 2 template\(s\): 2 written, "
+                r"0 unchanged, 0 skipped, 0 failed, \d+ bytes$",
+            )
+            with stats_path.open() as f:
+                stats = json.load(f)
+            self.assertEqual(list(stats["templates"]), ["run-tests", "run-coverage"])
+            run_tests = stats["templates"]["run-tests"]
+            self.assertEqual(
+                sorted(run_tests),
+                [
+                    "bytes",
+                    "changed",
+                    "failed",
+                    "lookup",
+                    "render",
+                    "skipped",
+                    "write",
+                ],
+            )
+            self.assertEqual(
+                run_tests["bytes"], (tempdir / "run-tests.sh").stat().st_size
+            )
+            self.assertTrue(run_tests["changed"])
+            self.assertEqual(stats["written"], 2)
+            self.assertEqual(
+                stats["bytes"], sum(t["bytes"] for t in stats["templates"].values())
+            )
+
+            hook_.write(state)
+            with stats_path.open() as f:
+                stats = json.load(f)
+            self.assertEqual((stats["written"], stats["skipped"]), (0, 2))
+        finally:
+            del os.environ["MXMAKE_HOOK_STATS"]
+
+    def test_template_workers(self):
+        hook_ = hook.Hook()
+        settings = {}
+        configuration = testing.TestConfiguration(settings=settings)
+        self.assertIsNone(hook_.template_workers(configuration))
+        settings["mxmake-template-workers"] = "4"
+        self.assertEqual(hook_.template_workers(configuration), 4)
+        for value in ("0", "many"):
+            settings["mxmake-template-workers"] = value
+            with self.assertLogs("mxmake", level="WARNING"):
+                self.assertIsNone(hook_.template_workers(configuration))
+
+    @testing.template_directory(reset_registry=True)
+    def test_generate_templates(self, tempdir):
+        class Template(templates.MxIniBoundTemplate):
+            target_folder = tempdir
+            template_name = "template.in"
+            template_variables = {}
+
+            @property
+            def target_name(self):
+                return f"{self.name}.out"
+
+        templates.template("first")(type("First", (Template,), {}))
+        templates.template("second")(type("Second", (Template,), {}))
+        templates.template("third")(type("Third", (Template,), {}))
+
+        hook_ = hook.Hook()
+        settings = {"mxmake-templates": "third first second"}
+        configuration = testing.TestConfiguration(settings=settings)
+        state = mxdev.State(configuration=configuration)
+        loader = DictLoader({"template.in": "content"})
+        environment = Environment(loader=loader)
+        with mock.patch.object(
+            hook, "get_template_environment", return_value=environment
+        ):
+            # templates are logged in configured order
+            for workers in ("1", "3"):
+                for name in ("first", "second", "third"):
+                    (tempdir / f"{name}.out").unlink(missing_ok=True)
+                settings["mxmake-template-workers"] = workers
+                with self.assertLogs("mxmake") as logs:
+                    hook_.generate_templates(state)
+                self.assertEqual(
+                    logs.output,
+                    [
+                        f"INFO:mxmake:mxmake: Generated '{tempdir / name}.out'"
+                        for name in ("third", "first", "second")
+                    ],
+                )
+
+            # unchanged templates are not logged
+            with self.assertNoLogs("mxmake"):
+                hook_.generate_templates(state)
+
+            # all errors are reported
+            settings["mxmake-templates"] = "first second first third"
+            loader.mapping.clear()
+            with (
+                self.assertLogs("mxmake") as logs,
+                self.assertRaises(RuntimeError) as cm,
+            ):
+                hook_.generate_templates(state)
+            self.assertEqual(
+                str(cm.exception), "mxmake: Generating 4 template(s) failed"
+            )
+            self.assertEqual(
+                logs.output,
+                [
+                    "ERROR:mxmake:mxmake: Template 'first' and template 'first' "
+                    f"both generate '{tempdir / 'first.out'}'",
+                    "ERROR:mxmake:mxmake: Template 'first' failed: template.in",
+                    "ERROR:mxmake:mxmake: Template 'second' failed: template.in",
+                    "ERROR:mxmake:mxmake: Template 'third' failed: template.in",
+                ],
+            )
+
+    @testing.template_directory()
+    def test_Hook_manifest(self, tempdir):
+        mxini = tempdir / "mx.ini"
+
+        def write(settings):
+            with mxini.open("w") as fd:
+                fd.write(f"[settings]\n{settings}")
+            hook_ = hook.Hook()
+            configuration = mxdev.Configuration(mxini, hooks=[hook_])
+            hook_.write(mxdev.State(configuration=configuration))
+            return {
+                name: "skipped" if stats["skipped"] else stats["changed"]
+                for name, stats in hook_.stats.items()
+            }
+
+        settings = "mxmake-templates = run-tests run-coverage\n"
+        self.assertEqual(write(settings), {"run-tests": True, "run-coverage": True})
+        manifest_path = tempdir / "manifest.json"
+        with manifest_path.open() as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["version"], hook.__version__)
+        self.assertEqual(
+            manifest["templates"]["run-tests"]["target"], str(tempdir / "run-tests.sh")
+        )
+        self.assertEqual(
+            manifest["templates"]["run-tests"]["output"],
+            utils.file_hash(tempdir / "run-tests.sh"),
+        )
+
+        # unchanged inputs and outputs
+        self.assertEqual(
+            write(settings), {"run-tests": "skipped", "run-coverage": "skipped"}
+        )
+
+        # changed, modified and removed outputs
+        with (tempdir / "run-tests.sh").open("a") as f:
+            f.write("# modified\n")
+        (tempdir / "run-coverage.sh").unlink()
+        self.assertEqual(write(settings), {"run-tests": True, "run-coverage": True})
+
+        # changed inputs
+        settings += "mxmake-test-path = src\n"
+        self.assertEqual(write(settings), {"run-tests": True, "run-coverage": True})
+        self.assertEqual(
+            write(settings), {"run-tests": "skipped", "run-coverage": "skipped"}
+        )
+
+        # manifest of other version is ignored
+        with manifest_path.open() as f:
+            manifest = json.load(f)
+        manifest["version"] = "0.0"
+        with manifest_path.open("w") as f:
+            json.dump(manifest, f)
+        self.assertEqual(write(settings), {"run-tests": False, "run-coverage": False})
+
+        # entries of templates no longer configured are dropped
+        write("mxmake-templates = run-tests\n")
+        with manifest_path.open() as f:
+            self.assertEqual(list(json.load(f)["templates"]), ["run-tests"])
+
+    @testing.template_directory()
+    def test_generate_additional_sources_targets(self, tempdir):
+        sources = tempdir / "sources"
+        for name in ("a", "b", "c"):
+            (sources / name).mkdir(parents=True)
+            (sources / name / "pyproject.toml").touch()
+        (sources / "b" / "setup.py").touch()
+        mxini = tempdir / "mx.ini"
+        with mxini.open("w") as fd:
+            fd.write(
+                "[settings]\n"
+                f"default-target = {sources}\n"
+                "\n[a]\nurl = https://example.com/a.git\n"
+                "\n[b]\nurl = https://example.com/b.git\n"
+                "install-mode = fixed\nextras = test\n"
+                "\n[c]\nurl = https://example.com/c.git\n"
+                "install-mode = skip\n"
+                "\n[d]\nurl = https://example.com/d.git\n"
+            )
+        hook_ = hook.Hook()
+        configuration = mxdev.Configuration(mxini, hooks=[hook_])
+        hook_.write(mxdev.State(configuration=configuration))
+
+        content = (tempdir / "additional_sources_targets.mk").read_text()
+        self.assertIn(
+            "ADDITIONAL_SOURCES_TARGETS=$(wildcard "
+            f"{sources / 'a' / 'pyproject.toml'} "
+            f"{sources / 'b' / 'pyproject.toml'} {sources / 'b' / 'setup.py'})",
+            content,
+        )
+        self.assertIn(
+            f"{tempdir / 'packages' / 'b.stamp'}: "
+            f"$(wildcard {sources / 'b' / 'pyproject.toml'} "
+            f"{sources / 'b' / 'setup.py'})\n",
+            content,
+        )
+        self.assertNotIn("# c", content)
+        self.assertNotIn("# d", content)
+        self.assertEqual(
+            sorted(p.name for p in (tempdir / "packages").iterdir()),
+            ["a.stamp", "b.stamp"],
+        )
+
+        # existing stamps are not touched, changed files are detected after
+        # sources have been updated and the hook ran again
+        stamp = tempdir / "packages" / "a.stamp"
+        os.utime(stamp, ns=(0, 0))
+        os.utime(sources / "a" / "pyproject.toml", ns=(10**9, 10**9))
+        hook_.write(mxdev.State(configuration=configuration))
+        self.assertEqual(stamp.stat().st_mtime_ns, 0)
+        self.assertLess(
+            stamp.stat().st_mtime_ns,
+            (sources / "a" / "pyproject.toml").stat().st_mtime_ns,
+        )
+
+        # stamps of new source packages are newer than their files
+        (tempdir / "packages" / "b.stamp").unlink()
+        os.utime(sources / "b" / "setup.py", ns=(10**9, 10**9))
+        hook_.write(mxdev.State(configuration=configuration))
+        self.assertGreater(
+            (tempdir / "packages" / "b.stamp").stat().st_mtime_ns,
+            (sources / "b" / "setup.py").stat().st_mtime_ns,
+        )
+
+        # no source packages
+        with mxini.open("w") as fd:
+            fd.write("[settings]\n")
+        hook_ = hook.Hook()
+        configuration = mxdev.Configuration(mxini, hooks=[hook_])
+        hook_.write(mxdev.State(configuration=configuration))
+        self.assertFalse((tempdir / "additional_sources_targets.mk").exists())
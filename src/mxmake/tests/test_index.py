@@ -0,0 +1,102 @@
+from mxmake import index
+from mxmake import testing
+from mxmake import topics
+from unittest import mock
+
+import json
+import os
+import unittest
+
+
+class TestIndex(unittest.TestCase):
+    @testing.temp_directory
+    def test_MetadataIndex(self, tmpdir):
+        index_path = tmpdir / "cache" / "index.json"
+        source = tmpdir / "source.mk"
+        with source.open("w") as f:
+            f.write("#:[source]\n")
+
+        metadata_index = index.MetadataIndex(index_path)
+        self.assertEqual(metadata_index.entries, {})
+        self.assertIsNone(metadata_index.get("domain", source))
+
+        metadata_index.set("domain", source, {"title": "Title"})
+        self.assertTrue(metadata_index.dirty)
+        self.assertEqual(metadata_index.get("domain", source), {"title": "Title"})
+        self.assertIsNone(metadata_index.get("topic", source))
+
+        metadata_index.save()
+        self.assertFalse(metadata_index.dirty)
+        with index_path.open() as f:
+            self.assertEqual(list(json.load(f)), [f"domain:{source}"])
+
+        # served from persisted index
+        metadata_index = index.MetadataIndex(index_path)
+        self.assertEqual(metadata_index.get("domain", source), {"title": "Title"})
+
+        # changed file invalidates entry
+        with source.open("a") as f:
+            f.write("#:title = Title\n")
+        self.assertIsNone(metadata_index.get("domain", source))
+
+        # entries of removed files get dropped on save
+        metadata_index.set("domain", source, {"title": "Title"})
+        source.unlink()
+        metadata_index.save()
+        with index_path.open() as f:
+            self.assertEqual(json.load(f), {})
+
+        # index without path is never persisted
+        metadata_index = index.MetadataIndex(None)
+        metadata_index.set("domain", tmpdir, {})
+        metadata_index.save()
+        self.assertTrue(metadata_index.dirty)
+
+    @mock.patch.dict(os.environ)
+    @testing.temp_directory
+    def test_get_metadata_index(self, tmpdir):
+        index.get_metadata_index.cache_clear()
+        os.environ["MXMAKE_CACHE"] = str(tmpdir)
+        try:
+            metadata_index = index.get_metadata_index()
+            self.assertEqual(
+                metadata_index.path, tmpdir / f"index-{index.__version__}.json"
+            )
+            self.assertTrue(metadata_index is index.get_metadata_index())
+
+            # indexes of other versions are kept, projects might use them
+            (tmpdir / "index-0.0.json").touch()
+            metadata_index.set("domain", tmpdir, {})
+            metadata_index.save()
+            self.assertEqual(
+                sorted(p.name for p in tmpdir.iterdir()),
+                sorted(["index-0.0.json", f"index-{index.__version__}.json"]),
+            )
+
+            os.environ["MXMAKE_CACHE"] = ""
+            index.get_metadata_index.cache_clear()
+            self.assertIsNone(index.get_metadata_index().path)
+        finally:
+            index.get_metadata_index.cache_clear()
+
+    @testing.temp_directory
+    def test_domain_metadata_from_index(self, tmpdir):
+        domain_path = tmpdir / "domain.mk"
+        with domain_path.open("w") as f:
+            f.write("#:[example]\n#:title = Title\n")
+        metadata_index = index.get_metadata_index()
+        metadata_index.set(
+            "domain",
+            domain_path,
+            {
+                "title": "Indexed",
+                "description": "",
+                "depends": [],
+                "soft_depends": [],
+                "settings": [],
+                "targets": [],
+            },
+        )
+        domain = topics.Domain(topic="topic", name="example", file=domain_path)
+        self.assertEqual(domain.title, "Indexed")
+        self.assertIsNone(getattr(domain, "_config", None))
@@ -0,0 +1,165 @@
+from contextlib import redirect_stdout
+from mxmake import main
+from mxmake import testing
+from pathlib import Path
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+
+
+# Modules only needed for prompting and rendering. They must not be imported
+# when starting the command line interface, ``help-generator`` and ``list``.
+DEFERRED_MODULES = {
+    "inquirer",
+    "jinja2",
+    "mxdev",
+    "mxmake.hook",
+    "mxmake.templates",
+    "yaml",
+}
+
+
+def imported_modules(statement: str, cwd: Path | None = None) -> set[str]:
+    """Return names of modules imported by statement as reported by
+    ``python -X importtime``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        cwd=cwd,
+        text=True,
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        name = line.rsplit("|", 1)[1].strip()
+        if name != "imported package":
+            modules.add(name)
+    return modules
+
+
+class TestMain(unittest.TestCase):
+    def test_startup_imports(self):
+        modules = imported_modules("import mxmake.main")
+        self.assertIn("mxmake.topics", modules)
+        self.assertEqual(modules & DEFERRED_MODULES, set())
+
+    def test_list_imports(self):
+        modules = imported_modules(
+            "from mxmake.main import parser\n"
+            "args = parser.parse_args(['list', '-t', 'core', '-d', 'base'])\n"
+            "args.func(args)\n"
+        )
+        self.assertEqual(modules & DEFERRED_MODULES, set())
+
+    @testing.temp_directory
+    def test_help_generator_imports(self, tempdir):
+        # domain metadata is needed for the help, but no template rendering
+        shutil.copy(Path(__file__).parent / "expected" / "Makefile", tempdir)
+        modules = imported_modules(
+            "from mxmake.main import parser\n"
+            "args = parser.parse_args(['help-generator'])\n"
+            "args.func(args)\n",
+            cwd=tempdir,
+        )
+        self.assertIn("mxmake.helpgen", modules)
+        self.assertEqual(modules & DEFERRED_MODULES, set())
+
+    def test_list_dependencies(self):
+        def run(*arguments):
+            args = main.parser.parse_args(["list", *arguments])
+            output = io.StringIO()
+            with redirect_stdout(output):
+                args.func(args)
+            return output.getvalue()
+
+        self.assertEqual(
+            run("--required-by", "ldap.python-ldap"),
+            "Domains required by ldap.python-ldap:\n"
+            "  Hard:\n"
+            "    - core.base\n"
+            "    - core.mxenv\n"
+            "    - ldap.openldap\n"
+            "  Soft: None\n",
+        )
+        self.assertEqual(
+            run("--required-by", "core.mxfiles").splitlines()[-2:],
+            ["  Soft:", "    - core.sources"],
+        )
+        self.assertEqual(
+            run("--depends-on", "ldap.openldap"),
+            "Domains depending on ldap.openldap:\n"
+            "  Hard:\n"
+            "    - ldap.python-ldap\n"
+            "  Soft: None\n",
+        )
+        self.assertEqual(
+            run("--depends-on", "core.sources").splitlines()[-2:],
+            ["  Soft:", "    - core.mxfiles"],
+        )
+
+        # unknown domains
+        for option in ("--depends-on", "--required-by"):
+            for fqn in ("core.inexistent", "inexistent.domain", "invalid"):
+                output = io.StringIO()
+                with redirect_stdout(output), self.assertRaises(SystemExit) as cm:
+                    args = main.parser.parse_args(["list", option, fqn])
+                    args.func(args)
+                self.assertEqual(cm.exception.code, 1)
+                self.assertEqual(
+                    output.getvalue(), f"Requested domain not found: {fqn}\n"
+                )
+
+    @testing.temp_directory
+    def test_create_config_unchanged(self, tempdir):
+        cwd = Path.cwd()
+        os.chdir(tempdir)
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main.create_config(
+                    prompt=False, preseeds={"topics": {"core": {"mxenv": {}}}}
+                )
+            makefile = tempdir / "Makefile"
+            self.assertNotIn("up to date", output.getvalue())
+            os.utime(makefile, ns=(0, 0))
+
+            # whitespace in the settings section is not relevant
+            content = makefile.read_text().replace(
+                "# Default: python3\n", "# Default: python3  \n"
+            )
+            makefile.write_text(content)
+            os.utime(makefile, ns=(0, 0))
+            with redirect_stdout(output):
+                main.create_config(prompt=False, preseeds=None)
+            self.assertIn("Makefile is up to date, skip writing", output.getvalue())
+            self.assertEqual(makefile.stat().st_mtime_ns, 0)
+            self.assertEqual(makefile.read_text(), content)
+            self.assertEqual(
+                [p.name for p in tempdir.iterdir() if p.name.endswith(".tmp")], []
+            )
+
+            # changed settings comments get written, e.g. after an upgrade
+            makefile.write_text(content.replace("# Default:", "# Was:"))
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main.create_config(prompt=False, preseeds=None)
+            self.assertNotIn("up to date", output.getvalue())
+            self.assertNotIn("# Was:", makefile.read_text())
+
+            # changed body gets written
+            makefile.write_text(content + "# custom change\n")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main.create_config(prompt=False, preseeds=None)
+            self.assertNotIn("up to date", output.getvalue())
+            self.assertNotIn("# custom change", makefile.read_text())
+            self.assertIn("# Default:", makefile.read_text())
+        finally:
+            os.chdir(cwd)
@@ -0,0 +1,212 @@
+from mxmake import packages
+from mxmake import testing
+from unittest import mock
+
+import json
+import unittest
+
+
+REQUIREMENTS = """\
+###############################################################################
+# mxdev combined constraints
+-c constraints-mxdev.txt
+
+--extra-index-url https://example.com/simple
+-e ./sources/a[test]
+./sources/b
+requests>=2.0 \\
+    ; python_version >= "3.10"  # comment
+"""
+
+CONSTRAINTS = """\
+requests==2.31.0
+Zope.Interface==6.0
+urllib3==2.0.0
+"""
+
+
+class TestPackages(unittest.TestCase):
+    def test_requirement_name(self):
+        self.assertEqual(
+            packages.requirement_name("Zope.Interface==6"), "zope-interface"
+        )
+        self.assertEqual(packages.requirement_name("foo[bar]>=1"), "foo")
+        self.assertEqual(packages.requirement_name("foo @ https://x/f.zip"), "foo")
+        self.assertEqual(packages.requirement_name("foo"), "foo")
+        self.assertIsNone(packages.requirement_name("./sources/b"))
+        self.assertIsNone(packages.requirement_name("https://x/f.zip"))
+        self.assertIsNone(packages.requirement_name("-e ./sources/a"))
+
+    def test_source_path(self):
+        self.assertEqual(packages.source_path("-e ./sources/a[test]"), "./sources/a")
+        self.assertEqual(packages.source_path("--editable=./a"), "./a")
+        self.assertEqual(packages.source_path("/b ; python_version>'3'"), "/b")
+        self.assertIsNone(packages.source_path("requests>=2"))
+        self.assertIsNone(packages.source_path("https://x/f.zip"))
+        self.assertIsNone(packages.source_path("-e git+https://x/a.git#egg=a"))
+
+    @testing.temp_directory
+    def test_Requirements(self, tempdir):
+        (tempdir / "requirements.txt").write_text(REQUIREMENTS)
+        (tempdir / "constraints-mxdev.txt").write_text(CONSTRAINTS)
+        requirements = packages.Requirements.read(tempdir / "requirements.txt")
+        self.assertEqual(
+            requirements.options, ["--extra-index-url https://example.com/simple"]
+        )
+        self.assertEqual(requirements.constraints_refs, ["constraints-mxdev.txt"])
+        self.assertEqual(
+            requirements.requirements,
+            [
+                "-e ./sources/a[test]",
+                "./sources/b",
+                'requests>=2.0 ; python_version >= "3.10"',
+            ],
+        )
+        self.assertEqual(
+            requirements.constraints,
+            {
+                "requests": ["requests==2.31.0"],
+                "zope-interface": ["Zope.Interface==6.0"],
+                "urllib3": ["urllib3==2.0.0"],
+            },
+        )
+        self.assertEqual(
+            requirements.sources, {"-e ./sources/a[test]": {}, "./sources/b": {}}
+        )
+        (tempdir / "sources" / "b").mkdir(parents=True)
+        (tempdir / "sources" / "b" / "setup.py").write_text("setup()")
+        (tempdir / "sources" / "b" / "README.md").write_text("readme")
+        requirements = packages.Requirements.read(tempdir / "requirements.txt")
+        self.assertEqual(list(requirements.sources["./sources/b"]), ["setup.py"])
+
+    def test_plan(self):
+        requirements = packages.Requirements(
+            requirements=["-e ./sources/a", "requests"],
+            constraints={"requests": ["requests==2"], "urllib3": ["urllib3==2"]},
+            sources={"-e ./sources/a": {"setup.py": "1"}},
+        )
+        state = {
+            "version": packages.STATE_VERSION,
+            "installer": ["pip"],
+            "install_options": [],
+            "options": [],
+            "constraints_refs": [],
+            "requirements": ["-e ./sources/a", "requests"],
+            "constraints": {"requests": ["requests==2"], "urllib3": ["urllib3==2"]},
+            "sources": {"-e ./sources/a": {"setup.py": "1"}},
+        }
+        installed = {"requests": "2", "urllib3": "2"}
+
+        def plan(state):
+            return packages.plan(state, requirements, ["pip"], [], installed)
+
+        self.assertIsNone(plan(None))
+        self.assertIsNone(plan({**state, "installer": ["uv", "pip"]}))
+        self.assertIsNone(plan({**state, "options": ["--pre"]}))
+        self.assertEqual(plan(state), [])
+
+        # added or changed requirements
+        self.assertEqual(
+            plan({**state, "requirements": ["requests"]}), ["-e ./sources/a"]
+        )
+
+        # changed files of source packages, their requirement lines never
+        # change
+        self.assertEqual(
+            plan({**state, "sources": {"-e ./sources/a": {"setup.py": "0"}}}),
+            ["-e ./sources/a"],
+        )
+
+        # changed constraints of requirements and installed dependencies
+        self.assertEqual(
+            plan({**state, "constraints": {"requests": ["requests==1"]}}),
+            ["requests", "urllib3"],
+        )
+        del installed["urllib3"]
+        self.assertEqual(
+            plan({**state, "constraints": {"requests": ["requests==1"]}}),
+            ["requests"],
+        )
+
+    @testing.temp_directory
+    def test_install_packages(self, tempdir):
+        requirements_file = tempdir / "requirements.txt"
+        requirements_file.write_text(REQUIREMENTS)
+        (tempdir / "constraints-mxdev.txt").write_text(CONSTRAINTS)
+        state_file = tempdir / "files" / "packages.json"
+        installed_file = tempdir / "files" / "installed.txt"
+        calls = []
+
+        def run_installer(installer, options, path):
+            calls.append((installer, options, path.read_text()))
+            return 0
+
+        def install():
+            calls.clear()
+            with mock.patch.object(packages, "run_installer", run_installer):
+                return packages.install_packages(
+                    requirements_file,
+                    state_file,
+                    installed_file,
+                    "python -m pip",
+                    "--pre",
+                )
+
+        # full install on first run
+        self.assertEqual(install(), 0)
+        self.assertEqual(calls, [(["python", "-m", "pip"], ["--pre"], REQUIREMENTS)])
+        with state_file.open() as f:
+            state = json.load(f)
+        self.assertEqual(len(state["requirements"]), 3)
+        self.assertIn("mxmake==", installed_file.read_text())
+
+        # nothing changed
+        self.assertEqual(install(), 0)
+        self.assertEqual(calls, [])
+
+        # changed requirement and constraint
+        requirements_file.write_text(REQUIREMENTS.replace("./sources/b", "./sources/c"))
+        (tempdir / "constraints-mxdev.txt").write_text(
+            CONSTRAINTS.replace("2.31.0", "2.32.0")
+        )
+        self.assertEqual(install(), 0)
+        self.assertEqual(
+            calls[0][2],
+            "--extra-index-url https://example.com/simple\n"
+            "-c constraints-mxdev.txt\n"
+            "./sources/c\n"
+            'requests>=2.0 ; python_version >= "3.10"\n',
+        )
+        self.assertEqual(
+            sorted(p.name for p in tempdir.iterdir() if p.is_file()),
+            ["constraints-mxdev.txt", "requirements.txt"],
+        )
+
+        # changed files of source package, e.g. after updating sources
+        (tempdir / "sources" / "a").mkdir(parents=True)
+        (tempdir / "sources" / "a" / "pyproject.toml").write_text("[project]")
+        self.assertEqual(install(), 0)
+        self.assertEqual(calls[0][2].splitlines()[2:], ["-e ./sources/a[test]"])
+        self.assertEqual(install(), 0)
+        self.assertEqual(calls, [])
+
+        # failed install does not update the state
+        requirements_file.write_text(REQUIREMENTS + "other\n")
+        with mock.patch.object(packages, "run_installer", return_value=1):
+            self.assertEqual(
+                packages.install_packages(
+                    requirements_file,
+                    state_file,
+                    installed_file,
+                    "python -m pip",
+                    "--pre",
+                ),
+                1,
+            )
+        self.assertEqual(install(), 0)
+        self.assertEqual(calls[0][2].splitlines()[-1], "other")
+
+        # missing installed record results in full install
+        installed_file.unlink()
+        self.assertEqual(install(), 0)
+        self.assertEqual(calls[0][2], REQUIREMENTS + "other\n")
@@ -54,6 +54,8 @@ class TestParser(unittest.TestCase):
             ),
             "\\\n\tvalue\\\n\tvalue",
         )
+        with self.assertRaises(parser.SettingMissing):
+            makefile_parser.parse_setting(["OTHER?=value"], "SETTING")
 
         self.assertEqual(makefile_parser.fqns, ["core.base", "core.mxenv"])
         self.assertEqual(
@@ -65,6 +67,8 @@ class TestParser(unittest.TestCase):
                 "core.base.INCLUDE_MAKEFILE": "include.mk",
                 "core.base.EXTRA_PATH": "",
                 "core.base.PROJECT_PATH_PYTHON": "",
+                "core.base.MXMAKE_HASH_STAMPS": "false",
+                "core.base.MXMAKE_JOBS": "",
                 "core.mxenv.PRIMARY_PYTHON": "python3",
                 "core.mxenv.PYTHON_MIN_VERSION": "3.7",
                 "core.mxenv.PYTHON_PACKAGE_INSTALLER": "pip",
@@ -77,3 +81,92 @@ class TestParser(unittest.TestCase):
             },
         )
         self.assertEqual(makefile_parser.topics, {"core": ["base", "mxenv"]})
+
+    def test_tokenize(self):
+        fqns, assignments = parser.tokenize(
+            [
+                "# DOMAINS:\n",
+                "#: core.base\n",
+                "#: core.mxenv\n",
+                "\n",
+                "# A comment\n",
+                "SINGLE?=value\n",
+                "EMPTY?=\n",
+                "MULTI?=value\\\n",
+                "\n",
+                "\tvalue\\\n",
+                "\tvalue\n",
+                "SINGLE?=other\n",
+                "NOT_A_SETTING:=value\n",
+                "# END SETTINGS - DO NOT EDIT BELOW THIS LINE\n",
+                "#: core.ignored\n",
+                "BELOW?=value\n",
+            ]
+        )
+        self.assertEqual(fqns, ["core.base", "core.mxenv"])
+        self.assertEqual(
+            assignments,
+            {"SINGLE": "value", "EMPTY": "", "MULTI": "value\\\n\tvalue\\\n\tvalue"},
+        )
+
+        # continuation at end of input
+        self.assertEqual(
+            parser.tokenize(["SETTING?=\\", "\tvalue\\"])[1],
+            {"SETTING": "\\\n\tvalue\\"},
+        )
+
+    @testing.temp_directory
+    def test_SettingsModel(self, tempdir):
+        domains = topics.resolve_domain_dependencies(
+            topics.collect_missing_dependencies([topics.get_domain("core.mxenv")])
+        )
+        factory = templates.template.lookup("makefile")
+        template = factory(
+            tempdir,
+            domains,
+            {"core.base.EXTRA_PATH": "a\\\n\tb"},
+            templates.get_template_environment(),
+        )
+        content = template.render()
+        lines = content.splitlines(keepends=True)
+        model = parser.SettingsModel.parse(lines)
+
+        # round trip
+        self.assertEqual(model.dumps(), content)
+
+        self.assertEqual(model.fqns, ["core.base", "core.mxenv"])
+        self.assertEqual(
+            [group.fqn for group in model.groups], [None, "core.base", "core.mxenv"]
+        )
+        self.assertEqual(model.groups[0].assignments, [])
+        extra_path = model.groups[1].assignments[4]
+        self.assertEqual(extra_path.name, "EXTRA_PATH")
+        self.assertEqual(extra_path.lines, ["EXTRA_PATH?=a\\\n", "\tb\n"])
+        self.assertEqual(extra_path.value, "a\\\n\tb")
+        self.assertTrue(model.body[0].startswith(parser.SETTINGS_END))
+        self.assertTrue(model.equivalent(model))
+
+        def changed(old, new):
+            return parser.SettingsModel.parse(
+                content.replace(old, new, 1).splitlines(keepends=True)
+            )
+
+        # blank lines and trailing whitespace are ignored
+        self.assertTrue(model.equivalent(changed("\n\n", "\n\n\n")))
+        self.assertTrue(model.equivalent(changed("?=python3", "?=python3  ")))
+        self.assertTrue(
+            model.equivalent(changed("# Default: python3\n", "# Default: python3  \n"))
+        )
+
+        # comments, values, domains and body are compared
+        self.assertFalse(model.equivalent(changed("# Default:", "# Was:")))
+        self.assertFalse(model.equivalent(changed("?=python3", "?=python3.12")))
+        self.assertFalse(model.equivalent(changed("\tb\n", "\tc\n")))
+        self.assertFalse(model.equivalent(changed("#: core.mxenv", "#: core.x")))
+        self.assertFalse(model.equivalent(changed("## core.mxenv", "## core.x")))
+        self.assertFalse(model.equivalent(changed("INSTALL_TARGETS?=", "X?=")))
+
+        # stop at end of settings
+        model = parser.SettingsModel.parse(lines, body=False)
+        self.assertEqual(model.body, [])
+        self.assertFalse(model.dumps().endswith(parser.SETTINGS_END))
@@ -1,14 +1,24 @@
+from jinja2 import ChoiceLoader
 from jinja2 import Environment
 from jinja2 import FileSystemLoader
+from jinja2 import ModuleLoader
+from jinja2 import PackageLoader
+from mxmake import environment
 from mxmake import hook
 from mxmake import templates
 from mxmake import testing
 from mxmake import topics
 from mxmake import utils
 from pathlib import Path
+from unittest import mock
 
 import doctest
 import mxdev
+import os
+import shutil
+import stat
+import subprocess
+import unittest
 
 
 EXPECTED_DIRECTORY = Path(__file__).parent / "expected"
@@ -47,6 +57,51 @@ class TestTemplates(testing.RenderTestCase):
             },
         )
 
+    @mock.patch.dict(os.environ)
+    @testing.temp_directory
+    def test_get_template_environment(self, tempdir):
+        templates.get_template_environment.cache_clear()
+        os.environ["MXMAKE_CACHE"] = str(tempdir)
+        (tempdir / "templates-0.0").mkdir()
+        try:
+            # source templates are used in development checkouts
+            with mock.patch.object(templates, "compiled_templates", return_value=None):
+                template_environment = templates.get_template_environment()
+            self.assertIs(template_environment, templates.get_template_environment())
+            self.assertIsInstance(template_environment.loader, PackageLoader)
+
+            # compiled source templates are cached on disk
+            cache_directory = Path(template_environment.bytecode_cache.directory)
+            self.assertEqual(
+                cache_directory, tempdir / f"templates-{templates.__version__}"
+            )
+            template_environment.get_template("Makefile")
+            self.assertEqual(len(list(cache_directory.iterdir())), 1)
+
+            # caches of other versions are kept, projects might use them
+            self.assertTrue((tempdir / "templates-0.0").is_dir())
+
+            # templates compiled at build time are preferred
+            templates.get_template_environment.cache_clear()
+            with mock.patch.object(
+                templates, "compiled_templates", return_value=tempdir
+            ):
+                loader = templates.get_template_environment().loader
+            self.assertIsInstance(loader, ChoiceLoader)
+            self.assertIsInstance(loader.loaders[0], ModuleLoader)
+            self.assertIsInstance(loader.loaders[1], PackageLoader)
+
+            # caching disabled
+            os.environ["MXMAKE_CACHE"] = ""
+            self.assertIsNone(templates.get_bytecode_cache())
+
+            # cache folder not writable
+            os.environ["MXMAKE_CACHE"] = str(tempdir / "file")
+            (tempdir / "file").touch()
+            self.assertIsNone(templates.get_bytecode_cache())
+        finally:
+            templates.get_template_environment.cache_clear()
+
     @testing.template_directory()
     def test_Template(self, tempdir: Path):
         # cannot instantiate abstract template
@@ -71,13 +126,55 @@ class TestTemplates(testing.RenderTestCase):
             f.write("{{ param }}")
         environment = Environment(loader=FileSystemLoader(tempdir))
         template = Template(environment)
-        template.write()
-        with (tempdir / "target.out").open() as f:
+        self.assertEqual(template.render(), "value")
+
+        # fingerprint of template inputs
+        fingerprint = template.fingerprint()
+        self.assertEqual(fingerprint, Template(environment).fingerprint())
+        template.template_variables = {"param": "other"}
+        self.assertNotEqual(template.fingerprint(), fingerprint)
+        template.template_variables = {"param": "value"}
+        with (tempdir / "target.in").open("w") as f:
+            f.write("{{ param }}\n")
+        self.assertNotEqual(template.fingerprint(), fingerprint)
+        with (tempdir / "target.in").open("w") as f:
+            f.write("{{ param }}")
+        self.assertEqual(template.fingerprint(), fingerprint)
+        self.assertEqual(list(template.generate()), ["value"])
+        self.assertTrue(template.write())
+        self.assertEqual(template.write_stats.size, 5)
+        self.assertTrue(template.write_stats.changed)
+        self.assertGreater(template.write_stats.render, 0)
+        self.assertGreater(template.write_stats.write, 0)
+        target_path = tempdir / "target.out"
+        with target_path.open() as f:
             self.assertEqual(f.read(), "value")
 
         # check file mode
         self.assertEqual(template.file_mode, 0o644)
-        # XXX: check file mode in file system
+        self.assertEqual(stat.S_IMODE(target_path.stat().st_mode), 0o644)
+
+        # unchanged file is not written again
+        os.utime(target_path, ns=(0, 0))
+        self.assertFalse(template.write())
+        self.assertEqual(target_path.stat().st_mtime_ns, 0)
+        self.assertFalse(template.write_stats.changed)
+
+        # file mode gets fixed for unchanged file
+        target_path.chmod(0o600)
+        self.assertFalse(template.write())
+        self.assertEqual(stat.S_IMODE(target_path.stat().st_mode), 0o644)
+        self.assertEqual(target_path.stat().st_mtime_ns, 0)
+
+        # changed file gets replaced, no temporary file is left over
+        template.template_variables = {"param": "other"}
+        self.assertTrue(template.write())
+        with target_path.open() as f:
+            self.assertEqual(f.read(), "other")
+        self.assertEqual(stat.S_IMODE(target_path.stat().st_mode), 0o644)
+        self.assertEqual(
+            sorted(p.name for p in tempdir.iterdir()), ["target.in", "target.out"]
+        )
 
         # remove remplate
         removed = template.remove()
@@ -543,11 +640,40 @@ class TestTemplates(testing.RenderTestCase):
     @testing.template_directory()
     def test_AdditionalSourcesTargets(self, tempdir):
         factory = templates.template.lookup("additional_sources_targets")
-        template = factory(["a", "b"], templates.get_template_environment())
+        packages = [
+            {
+                "name": "a",
+                "files": ["sources/a/pyproject.toml"],
+                "stamp": ".mxmake/files/packages/a.stamp",
+            },
+            {
+                "name": "b",
+                "files": ["sources/b/setup.cfg", "sources/b/setup.py"],
+                "stamp": ".mxmake/files/packages/b.stamp",
+            },
+        ]
+        template = factory(packages, templates.get_template_environment())
         template.write()
 
         with (tempdir / "additional_sources_targets.mk").open() as f:
-            self.checkOutput("ADDITIONAL_SOURCES_TARGETS=$(wildcard a b)", f.read())
+            self.checkOutput(
+                """
+                ADDITIONAL_SOURCES_TARGETS=$(wildcard sources/a/pyproject.toml sources/b/setup.cfg sources/b/setup.py)
+
+                # a
+                ADDITIONAL_SOURCES_PACKAGE_TARGETS+=.mxmake/files/packages/a.stamp
+                .mxmake/files/packages/a.stamp: $(wildcard sources/a/pyproject.toml)
+                	@echo "Files of package a changed"
+                	@touch .mxmake/files/packages/a.stamp
+
+                # b
+                ADDITIONAL_SOURCES_PACKAGE_TARGETS+=.mxmake/files/packages/b.stamp
+                .mxmake/files/packages/b.stamp: $(wildcard sources/b/setup.cfg sources/b/setup.py)
+                	@echo "Files of package b changed"
+                	@touch .mxmake/files/packages/b.stamp
+                """,
+                f.read(),
+            )
 
     @testing.temp_directory
     def test_Makefile(self, tempdir):
@@ -561,6 +687,8 @@ class TestTemplates(testing.RenderTestCase):
             "core.base.INCLUDE_MAKEFILE": "include.mk",
             "core.base.EXTRA_PATH": "",
             "core.base.PROJECT_PATH_PYTHON": "",
+            "core.base.MXMAKE_HASH_STAMPS": "false",
+            "core.base.MXMAKE_JOBS": "",
             "core.mxenv.PRIMARY_PYTHON": "python3",
             "core.mxenv.PYTHON_MIN_VERSION": "3.10",
             "core.mxenv.PYTHON_PACKAGE_INSTALLER": "pip",
@@ -586,6 +714,161 @@ class TestTemplates(testing.RenderTestCase):
                 expected.read(), result.read(), optionflags=doctest.REPORT_UDIFF
             )
 
+    @unittest.skipIf(shutil.which("make") is None, "make not available")
+    @testing.temp_directory
+    def test_Makefile_acquire_lock(self, tempdir):
+        shutil.copy(EXPECTED_DIRECTORY / "Makefile", tempdir)
+        with (tempdir / "include.mk").open("w") as f:
+            for name in ("a", "b"):
+                f.write(
+                    f"{name}:\n"
+                    "\t@$(call acquire_lock,test)\n"
+                    f"\t@echo start {name} >> log.txt\n"
+                    "\t@sleep 0.2\n"
+                    f"\t@echo end {name} >> log.txt\n"
+                )
+        lock = tempdir / ".mxmake" / "locks" / "test"
+
+        def make(*targets):
+            subprocess.run(
+                ["make", "-s", "-j2", *targets], cwd=tempdir, check=True, timeout=30
+            )
+
+        # recipes acquiring the same lock do not run concurrently
+        make("a", "b")
+        self.assertIn(
+            (tempdir / "log.txt").read_text(),
+            ["start a\nend a\nstart b\nend b\n", "start b\nend b\nstart a\nend a\n"],
+        )
+        self.assertFalse(lock.exists())
+
+        # stale lock of a process which no longer exists gets removed
+        process = subprocess.Popen(["true"])
+        process.wait()
+        lock.mkdir(parents=True)
+        (lock / "pid").write_text(f"{process.pid}\n")
+        (tempdir / "log.txt").unlink()
+        make("a")
+        self.assertEqual((tempdir / "log.txt").read_text(), "start a\nend a\n")
+        self.assertFalse(lock.exists())
+
+    @unittest.skipIf(shutil.which("make") is None, "make not available")
+    @testing.temp_directory
+    def test_Makefile_reinstall_changed_source_package(self, tempdir):
+        domains = [topics.get_domain("qa.test")]
+        domains = topics.collect_missing_dependencies(domains)
+        domains = topics.resolve_domain_dependencies(domains)
+        domain_settings = {
+            f"{domain.fqn}.{setting.name}": setting.default
+            for domain in domains
+            for setting in domain.settings
+        }
+        environment = templates.get_template_environment()
+        factory = templates.template.lookup("makefile")
+        factory(tempdir, domains, domain_settings, environment).write()
+
+        (tempdir / "mx.ini").write_text("[settings]\n")
+        (tempdir / "requirements-mxdev.txt").touch()
+        pyproject = tempdir / "sources" / "a" / "pyproject.toml"
+        pyproject.parent.mkdir(parents=True)
+        pyproject.write_text("[project]\n")
+        files = tempdir / ".mxmake" / "files"
+        (tempdir / ".mxmake" / "sentinels").mkdir(parents=True)
+        (files / "packages").mkdir(parents=True)
+        (files / "packages" / "a.stamp").touch()
+        with mock.patch.dict(os.environ, {"MXMAKE_FILES": str(files)}):
+            factory = templates.template.lookup("additional_sources_targets")
+            packages = [
+                {
+                    "name": "a",
+                    "files": ["sources/a/pyproject.toml"],
+                    "stamp": ".mxmake/files/packages/a.stamp",
+                }
+            ]
+            factory(packages, environment).write()
+        run_tests = files / "run-tests.sh"
+        run_tests.write_text("#!/bin/sh\necho Tests run\n")
+        run_tests.chmod(run_tests.stat().st_mode | stat.S_IEXEC)
+        # python of the virtual environment only echoes its arguments
+        python = tempdir / "python"
+        python.write_text('#!/bin/sh\necho "python $@"\n')
+        python.chmod(python.stat().st_mode | stat.S_IEXEC)
+
+        def make(*args):
+            return subprocess.run(
+                ["make", "-s", *args, f"MXENV_PYTHON={python}"],
+                cwd=tempdir,
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=30,
+            ).stdout
+
+        # mark all targets up to date
+        make("-t", "test")
+        settings = (tempdir / ".mxmake" / "sentinels").glob("*.settings")
+        make(*(str(path.relative_to(tempdir)) for path in settings))
+        make("-t", "test")
+
+        output = make("test")
+        self.assertNotIn("Install python packages", output)
+        self.assertIn("Tests run", output)
+
+        # changed source package file reinstalls packages before running tests
+        pyproject.write_text("[project]\nname = 'a'\n")
+        output = make("test")
+        self.assertIn("Files of package a changed", output)
+        self.assertIn("Install python packages", output)
+        self.assertIn("-m mxmake install-packages", output)
+        self.assertLess(
+            output.index("Install python packages"), output.index("Tests run")
+        )
+
+        output = make("test")
+        self.assertNotIn("Install python packages", output)
+
+        # mxmake in virtual environment without install-packages command
+        python.write_text(
+            "#!/bin/sh\n"
+            'case "$*" in *"install-packages --help"*) exit 2;; esac\n'
+            'echo "python $@"\n'
+        )
+        pyproject.write_text("[project]\nname = 'b'\n")
+        output = make("test")
+        self.assertIn("Install python packages", output)
+        self.assertNotIn("install-packages", output)
+        self.assertIn("-m pip install -r requirements-mxdev.txt", output)
+        installed = files / "installed.txt"
+        self.assertEqual(installed.read_text(), "python -m pip freeze\n")
+
+    @unittest.skipIf(shutil.which("make") is None, "make not available")
+    @testing.temp_directory
+    def test_Makefile_mxfiles_dirty(self, tempdir):
+        domains = [topics.get_domain("core.mxfiles"), topics.get_domain("core.sources")]
+        domains = topics.collect_missing_dependencies(domains)
+        domains = topics.resolve_domain_dependencies(domains)
+        domain_settings = {
+            f"{domain.fqn}.{setting.name}": setting.default
+            for domain in domains
+            for setting in domain.settings
+        }
+        domain_settings["core.base.MXMAKE_HASH_STAMPS"] = "true"
+        factory = templates.template.lookup("makefile")
+        factory(
+            tempdir, domains, domain_settings, templates.get_template_environment()
+        ).write()
+        (tempdir / "mx.ini").write_text("[settings]\n")
+        sentinels = tempdir / ".mxmake" / "sentinels"
+        sentinels.mkdir(parents=True)
+        for name in ("mxfiles", "sources"):
+            (sentinels / f"{name}.hash").touch()
+
+        # dirty mxfiles rebuilds sources as well, like touching mx.ini does
+        subprocess.run(
+            ["make", "-s", "mxfiles-dirty"], cwd=tempdir, check=True, timeout=30
+        )
+        self.assertEqual(list(sentinels.iterdir()), [])
+
     @testing.temp_directory
     def test_MxIni(self, tempdir):
         domains = [
@@ -828,3 +1111,80 @@ class TestTemplates(testing.RenderTestCase):
                 """,
                 f.read(),
             )
+
+    @testing.template_directory()
+    def test_compiled_templates(self, tempdir):
+        compiled = tempdir / "compiled"
+        self.assertIsNone(environment.compiled_templates(compiled))
+        environment.compile_templates(compiled)
+        self.assertEqual(environment.compiled_templates(compiled), compiled)
+        self.assertEqual(
+            len(list(compiled.glob("tmpl_*.py"))),
+            len(list(environment.TEMPLATES_DIRECTORY.iterdir())),
+        )
+        source_environment = Environment(
+            loader=FileSystemLoader(environment.TEMPLATES_DIRECTORY),
+            **environment.ENVIRONMENT_OPTIONS,
+        )
+        compiled_environment = Environment(
+            loader=ModuleLoader(str(compiled)), **environment.ENVIRONMENT_OPTIONS
+        )
+
+        mxini = tempdir / "mx.ini"
+        with mxini.open("w") as fd:
+            fd.write(
+                "[settings]\n"
+                "mxmake-test-path = src\n"
+                "mxmake-source-path = src/package\n"
+                "[mxmake-env]\n"
+                "ENV_PARAM = env_value\n"
+                "[mxmake-run-tests]\n"
+                "environment = env\n"
+                "[mxmake-run-coverage]\n"
+                "environment = env\n"
+                "[mxmake-pip-conf]\n"
+                "find-links = https://example.com/\n"
+                "[mxmake-plone-site]\n"
+                "distribution = volto\n"
+                "extension_ids = plone.volto:default\n"
+                "[mxmake-proxy]\n"
+                "folder = core:*\n"
+            )
+        configuration = mxdev.Configuration(mxini, hooks=[hook.Hook()])
+        domains = topics.resolve_domain_dependencies(
+            [domain for topic in topics.load_topics() for domain in topic.domains]
+        )
+        factories = [
+            lambda env: templates.Makefile(tempdir, domains, {}, env),
+            lambda env: templates.MxIni(tempdir, domains, env),
+            lambda env: templates.AdditionalSourcesTargets(
+                [
+                    {
+                        "name": "a",
+                        "files": ["a/setup.py"],
+                        "stamp": "a.stamp",
+                    }
+                ],
+                env,
+            ),
+            lambda env: templates.Topics(env),
+            lambda env: templates.Dependencies(env),
+            *(
+                lambda env, name=name: templates.template.lookup(name)(env, {})
+                for name in templates.ci_template.templates
+            ),
+            *(
+                lambda env, name=name: templates.template.lookup(name)(
+                    configuration, env
+                )
+                for name in ("run-tests", "run-coverage", "pip-conf", "plone-site")
+            ),
+            lambda env: templates.ProxyMk(configuration, env),
+        ]
+        for test_runner in ("pytest", "zope-testrunner"):
+            configuration.settings["mxmake-test-runner"] = test_runner
+            for factory in factories:
+                self.assertEqual(
+                    factory(source_environment).render(),
+                    factory(compiled_environment).render(),
+                )
@@ -1,11 +1,14 @@
 from collections import Counter
 from dataclasses import dataclass
 from dataclasses import field
+from importlib.metadata import entry_points
 from mxmake import testing
 from mxmake import topics
 from pathlib import Path
 
 import configparser
+import subprocess
+import sys
 import unittest
 
 
@@ -75,6 +78,17 @@ class _TestDomain(topics.Domain):
         return self.soft_depends_
 
 
+class _TestEntryPoint:
+    def __init__(self, name: str, topic: topics.Topic, loaded: list[str]):
+        self.name = name
+        self.topic = topic
+        self.loaded = loaded
+
+    def load(self) -> topics.Topic:
+        self.loaded.append(self.name)
+        return self.topic
+
+
 class TestTopics(unittest.TestCase):
     def test_load_topics(self):
         topics_ = topics.load_topics()
@@ -89,6 +103,112 @@ class TestTopics(unittest.TestCase):
         domain = topics.get_domain("core.mxenv")
         self.assertEqual(domain.fqn, "core.mxenv")
 
+    def test_Registry(self):
+        registry = topics.Registry([topics.core, topics.qa])
+        self.assertEqual(registry.topics, [topics.core, topics.qa])
+        self.assertTrue(registry.topic("core") is topics.core)
+        with self.assertRaises(AttributeError):
+            registry.topic("inexistent")
+
+        domain = registry.domain("core.mxenv")
+        self.assertEqual(domain.fqn, "core.mxenv")
+        self.assertTrue(domain is registry.domain("core.mxenv"))
+        self.assertTrue(domain is topics.core.domain("mxenv"))
+        self.assertTrue(domain in topics.core.domains)
+        with self.assertRaises(AttributeError):
+            registry.domain("core.inexistent")
+        with self.assertRaises(AttributeError):
+            registry.domain("inexistent.mxenv")
+
+        self.assertTrue(topics.get_registry() is topics.get_registry())
+        self.assertTrue(topics.get_domain("core.mxenv") is domain)
+
+    @testing.temp_directory
+    def test_Registry_refresh(self, tmpdir):
+        def write(name, depends):
+            with (tmpdir / f"{name}.mk").open("w") as f:
+                f.write(f"#:[{name}]\n#:depends = {depends}\n")
+
+        write("a", "")
+        write("b", "topic.a")
+        write("other", "")
+        registry = topics.Registry([topics.Topic(name="topic", directory=tmpdir)])
+        dependencies = registry.dependencies
+        self.assertEqual(dependencies.depends("topic.b"), {"topic.a"})
+        domain = registry.domain("topic.b")
+        self.assertTrue(registry.domain("topic.b") is domain)
+        self.assertTrue(registry.dependencies is dependencies)
+
+        # changed domain file drops metadata and dependency table
+        write("b", "topic.other")
+        self.assertEqual(dependencies.depends("topic.b"), {"topic.other"})
+        self.assertFalse(registry.dependencies is dependencies)
+        self.assertTrue(registry.domain("topic.b") is domain)
+        self.assertEqual(domain.depends, ("topic.other",))
+
+    def test_Registry_lazy_entry_points(self):
+        loaded: list[str] = []
+        registry = topics.Registry(
+            entry_points=[
+                _TestEntryPoint("core", topics.core, loaded),
+                _TestEntryPoint("qa", topics.qa, loaded),
+                _TestEntryPoint("other-name", topics.ldap, loaded),
+            ]
+        )
+        self.assertTrue(registry.topic("core") is topics.core)
+        self.assertEqual(registry.domain("core.mxenv").fqn, "core.mxenv")
+        self.assertEqual(loaded, ["core"])
+        self.assertTrue(registry.topic("qa") is topics.qa)
+        self.assertEqual(loaded, ["core", "qa"])
+        # topic name differs from entry point name
+        self.assertTrue(registry.topic("ldap") is topics.ldap)
+        self.assertEqual(loaded, ["core", "qa", "other-name"])
+        with self.assertRaises(AttributeError):
+            registry.topic("inexistent")
+        self.assertEqual(registry.topics, [topics.core, topics.qa, topics.ldap])
+        self.assertEqual(loaded, ["core", "qa", "other-name"])
+
+    def test_Registry_topics_order(self):
+        # topics are listed in entry point order, independent of earlier
+        # lookups loading some of them
+        def registry():
+            return topics.Registry(
+                entry_points=[
+                    _TestEntryPoint("applications", topics.applications, []),
+                    _TestEntryPoint("core", topics.core, []),
+                    _TestEntryPoint("qa", topics.qa, []),
+                ]
+            )
+
+        expected = [topics.applications, topics.core, topics.qa]
+        self.assertEqual(registry().topics, expected)
+        registry_ = registry()
+        registry_.domain("qa.ruff")
+        registry_.topic("core")
+        self.assertEqual(registry_.topics, expected)
+
+        names = [ep.name for ep in entry_points(group="mxmake.topics")]
+        self.assertEqual([topic.name for topic in topics.get_registry().topics], names)
+
+    def test_get_topic_imports(self):
+        # requesting a topic must not import modules of other topics
+        script = (
+            "import sys\n"
+            "from importlib.metadata import entry_points\n"
+            "from mxmake.topics import get_topic\n"
+            "get_topic('core')\n"
+            "modules = {ep.module for ep in entry_points(group='mxmake.topics')"
+            " if ep.name != 'core'} - {get_topic.__module__}\n"
+            "print(sorted((modules | {'mxdev'}) & set(sys.modules)))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
     def test_ruff_domain_settings(self):
         """Test ruff domain has correct settings for check --fix feature."""
         domain = topics.get_domain("qa.ruff")
@@ -118,8 +238,12 @@ class TestTopics(unittest.TestCase):
             f.write(MAKEFILE_TEMPLATE)
 
         domain = topics.Domain(topic="topic", name="example", file=domain_path)
-        self.assertTrue(len(domain.file_data) > 0)
-        self.assertTrue(domain._file_data is domain.file_data)
+        header = list(domain.read_header())
+        self.assertEqual(header[0], "[example]\n")
+        self.assertEqual(header[-1], "default = B\n")
+        body = list(domain.read_body())
+        self.assertEqual(body[0], "SETTING_A?=A\n")
+        self.assertEqual(body[-1], "\t@rm -f $(EXAMPLE_TARGET)\n")
 
         config = domain.config
         self.assertIsInstance(config, configparser.ConfigParser)
@@ -142,10 +266,15 @@ class TestTopics(unittest.TestCase):
 
         self.assertEqual(domain.title, "Title")
         self.assertEqual(domain.description, "Description")
-        self.assertEqual(domain.depends, ["dependency-1", "dependency-2"])
+        self.assertEqual(domain.depends, ("dependency-1", "dependency-2"))
 
+        # metadata is compiled once from config
+        metadata = domain.metadata
+        self.assertTrue(domain._metadata is metadata)
+        self.assertEqual(metadata, domain.parse_metadata())
         config["example"]["depends"] = ""
-        self.assertEqual(domain.depends, [])
+        self.assertEqual(domain.depends, ("dependency-1", "dependency-2"))
+        self.assertEqual(domain.parse_metadata()["depends"], [])
 
         targets = domain.targets
         self.assertEqual(len(targets), 3)
@@ -158,6 +287,28 @@ class TestTopics(unittest.TestCase):
         self.assertEqual(settings[0].description, "Setting A")
         self.assertEqual(settings[0].default, "A")
 
+        # settings and targets are immutable and memoized
+        self.assertTrue(domain.settings is settings)
+        self.assertTrue(domain.targets is targets)
+        with self.assertRaises(AttributeError):
+            settings[0].name = "SETTING_C"  # type: ignore
+        self.assertFalse(hasattr(settings[0], "__dict__"))
+
+        # refresh drops memoized metadata only if domain file changed
+        self.assertFalse(domain.refresh())
+        self.assertTrue(domain.settings is settings)
+        with domain_path.open("w") as fd:
+            fd.write(
+                MAKEFILE_TEMPLATE.replace(
+                    "#:[setting.SETTING_B]",
+                    "#:[setting.SETTING_C]\n#:default = C\n#:\n#:[setting.SETTING_B]",
+                )
+            )
+        self.assertTrue(domain.refresh())
+        self.assertEqual(len(domain.settings), 3)
+        self.assertEqual(domain.depends, ("dependency-1", "dependency-2"))
+        self.assertFalse(domain.refresh())
+
         out_path = tmpdir / "domain_out.mk"
         with out_path.open("w") as fd:
             domain.write_to(fd)
@@ -166,6 +317,35 @@ class TestTopics(unittest.TestCase):
         self.assertEqual(out_content[0], "SETTING_A?=A\n")
         self.assertEqual(out_content[-1], "\t@rm -f $(EXAMPLE_TARGET)\n")
 
+    @testing.temp_directory
+    def test_Domain_header(self, tmpdir):
+        domain_path = tmpdir / "domain.mk"
+        with domain_path.open("w") as f:
+            f.write(
+                "#:[example]\n"
+                "#:title = Title\n"
+                "\n"
+                "#:[setting.SETTING_A]\n"
+                "#:default = A\n"
+                "\n"
+                "SETTING_A?=A\n"
+                "#:[setting.IGNORED]\n"
+            )
+        domain = topics.Domain(topic="topic", name="example", file=domain_path)
+        # header may contain blank lines, reading stops at makefile body
+        self.assertEqual(
+            list(domain.read_header()),
+            [
+                "[example]\n",
+                "title = Title\n",
+                "[setting.SETTING_A]\n",
+                "default = A\n",
+            ],
+        )
+        self.assertEqual([s.name for s in domain.settings], ["SETTING_A"])
+        # header lines are never written
+        self.assertEqual(list(domain.read_body()), ["SETTING_A?=A\n"])
+
     @testing.temp_directory
     def test_Topic(self, tmpdir):
         topicdir = tmpdir / "topic"
@@ -213,6 +393,12 @@ class TestTopics(unittest.TestCase):
             ),
         )
 
+        err = topics.CircularDependencyDomainError(
+            [domain], cycle=["t1.f1", "t1.f2", "t1.f1"]
+        )
+        self.assertTrue(str(err).endswith(" (cycle: t1.f1 -> t1.f2 -> t1.f1)"))
+        self.assertEqual(err.cycle, ["t1.f1", "t1.f2", "t1.f1"])
+
     def test_MissingDependencyDomainError(self):
         domain = _TestDomain(topic="t", name="t", depends_=["missing"], file="t.mk")
         err = topics.MissingDependencyDomainError(domain)
@@ -297,6 +483,38 @@ class TestTopics(unittest.TestCase):
             [f1, f2, f3],
         )
 
+    def test_DomainResolver_cycle(self):
+        f1 = _TestDomain(topic="t", name="f1", file="f1.mk")
+        f2 = _TestDomain(topic="t", name="f2", depends_=["t.f4"], file="f2.mk")
+        f3 = _TestDomain(topic="t", name="f3", depends_=["t.f2"], file="f3.mk")
+        f4 = _TestDomain(topic="t", name="f4", depends_=["t.f1", "t.f3"], file="f4.mk")
+        f5 = _TestDomain(topic="t", name="f5", depends_=["t.f4"], file="f5.mk")
+        with self.assertRaises(topics.CircularDependencyDomainError) as cm:
+            topics.resolve_domain_dependencies([f1, f2, f3, f4, f5])
+        self.assertEqual(cm.exception.cycle, ["t.f2", "t.f4", "t.f3", "t.f2"])
+
+    def test_DomainResolver_compat(self):
+        f1 = _TestDomain(topic="t", name="f1", file="f1.mk")
+        f2 = _TestDomain(topic="t", name="f2", depends_=["t.f1"], file="f2.mk")
+        f3 = _TestDomain(topic="t", name="f3", file="f3.mk")
+        f4 = _TestDomain(topic="t", name="f4", depends_=["t.f1"], file="f4.mk")
+        f5 = _TestDomain(topic="t", name="f5", depends_=["t.f2"], file="f5.mk")
+        domains = [f1, f2, f3, f4, f5]
+        # domains get inserted directly behind their last placed dependency
+        self.assertEqual(
+            topics.resolve_domain_dependencies(domains),
+            [f1, f4, f2, f5, f3],
+        )
+        self.assertEqual(
+            topics.resolve_domain_dependencies(domains, compat=False),
+            [f1, f2, f3, f4, f5],
+        )
+        self.assertEqual(domains, [f1, f2, f3, f4, f5])
+        self.assertEqual(
+            topics.resolve_domain_dependencies([f5, f4, f3, f2, f1], compat=False),
+            [f3, f1, f4, f2, f5],
+        )
+
     def test_collect_missing_dependencies(self):
         domains = [
             topics.get_domain("ldap.python-ldap"),
@@ -314,6 +532,28 @@ class TestTopics(unittest.TestCase):
             ],
         )
 
+    def test_DependencyTable(self):
+        dependencies = topics.get_registry().dependencies
+        self.assertEqual(
+            dependencies.depends("ldap.python-ldap"),
+            {"core.base", "core.mxenv", "ldap.openldap"},
+        )
+        self.assertTrue(
+            dependencies.depends("ldap.python-ldap")
+            is dependencies.depends("ldap.python-ldap")
+        )
+        self.assertEqual(dependencies.depends("core.base"), set())
+        self.assertEqual(dependencies.soft_depends("core.mxfiles"), {"core.sources"})
+        self.assertEqual(
+            dependencies.required_by("ldap.openldap"), {"ldap.python-ldap"}
+        )
+        self.assertIn("ldap.python-ldap", dependencies.required_by("core.base"))
+        self.assertEqual(dependencies.required_by("ldap.python-ldap"), set())
+        self.assertEqual(
+            dependencies.soft_required_by("core.sources"), {"core.mxfiles"}
+        )
+        self.assertEqual(dependencies.soft_required_by("core.base"), set())
+
     def test_set_domain_runtime_depends(self):
         f1 = _TestDomain(topic="t", name="f1", file="f1.ext")
         f2 = _TestDomain(
@@ -1,5 +1,7 @@
+from mxmake import testing
 from mxmake import utils
 from pathlib import Path
+from unittest import mock
 
 import os
 import unittest
@@ -15,6 +17,17 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(utils.mxmake_files(), Path("other"))
         del os.environ["MXMAKE_FILES"]
 
+    @mock.patch.dict(os.environ)
+    def test_mxmake_cache(self):
+        os.environ.pop("MXMAKE_CACHE", None)
+        os.environ["XDG_CACHE_HOME"] = "cache"
+        self.assertEqual(utils.mxmake_cache(), Path("cache") / "mxmake")
+        del os.environ["XDG_CACHE_HOME"]
+        os.environ["MXMAKE_CACHE"] = "other"
+        self.assertEqual(utils.mxmake_cache(), Path("other"))
+        os.environ["MXMAKE_CACHE"] = ""
+        self.assertIsNone(utils.mxmake_cache())
+
     def test_gh_actions_path(self):
         self.assertEqual(utils.gh_actions_path(), Path(".github") / "workflows")
         os.environ["MXMAKE_GH_ACTIONS_PATH"] = "other"
@@ -27,3 +40,12 @@ class TestUtils(unittest.TestCase):
     def test_list_value(self):
         self.assertEqual(utils.list_value(""), [])
         self.assertEqual(utils.list_value("a\nb c"), ["a", "b", "c"])
+
+    @testing.temp_directory
+    def test_file_hash(self, tmpdir):
+        path = tmpdir / "file"
+        self.assertIsNone(utils.file_hash(path))
+        with path.open("wb") as f:
+            f.write(b"content")
+        self.assertEqual(utils.file_hash(path), utils.content_hash(b"content"))
+        self.assertNotEqual(utils.file_hash(path), utils.content_hash(b"other"))
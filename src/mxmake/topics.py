@@ -1,23 +1,27 @@
 from collections import Counter
 from dataclasses import dataclass
-from mxdev.entry_points import load_eps_by_group
+from importlib.metadata import entry_points
+from importlib.metadata import EntryPoint
+from mxmake.index import get_metadata_index
+from mxmake.index import MetadataIndex
 from pathlib import Path
 
 import configparser
 import functools
+import heapq
 import io
 import operator
 import typing
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Setting:
     name: str
     description: str
     default: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Target:
     name: str
     description: str
@@ -42,26 +46,39 @@ class Domain:
     def fqn(self):
         return f"{self.topic}.{self.name}"
 
-    @property
-    def file_data(self) -> list[str]:
-        if (_file_data := getattr(self, "_file_data", None)) is not None:
-            return _file_data
-        with self.file.open() as f:
-            self.file_data = f.readlines()
-        return self._file_data
+    def read_header(self) -> typing.Iterator[str]:
+        """Stream header lines of domain file without leading ``#:``.
 
-    @file_data.setter
-    def file_data(self, value: list[str]):
-        self._file_data = value
+        Reading stops at the first line which is neither a header line nor
+        blank, thus the makefile body is never read.
+        """
+        with self.file.open() as f:
+            for line in f:
+                if line.startswith("#:"):
+                    yield line[2:]
+                elif line.strip():
+                    return
+
+    def read_body(self) -> typing.Iterator[str]:
+        """Stream lines of domain file without header and leading blank
+        lines.
+        """
+        leading_blankline = True
+        with self.file.open() as f:
+            for line in f:
+                if line.startswith("#:"):
+                    continue
+                if not line.strip() and leading_blankline:
+                    continue
+                leading_blankline = False
+                yield line
 
     @property
     def config(self) -> configparser.ConfigParser:
         if (_config := getattr(self, "_config", None)) is not None:
             return _config
         data = io.StringIO()
-        for line in self.file_data:
-            if line.startswith("#:"):
-                data.write(line[2:])
+        data.writelines(self.read_header())
         data.seek(0)
         config = self.config = configparser.ConfigParser(default_section=self.name)
         config.optionxform = str  # type: ignore
@@ -73,64 +90,108 @@ class Domain:
         self._config = value
 
     @property
+    def metadata(self) -> dict[str, typing.Any]:
+        """Domain metadata. Served from the metadata index if the domain file
+        has not changed since it was indexed.
+        """
+        if (_metadata := getattr(self, "_metadata", None)) is not None:
+            return _metadata
+        index = get_metadata_index()
+        fingerprint = self._fingerprint = MetadataIndex.fingerprint(self.file)
+        metadata = index.get("domain", self.file, fingerprint=fingerprint)
+        if metadata is None:
+            metadata = self.parse_metadata()
+            index.set("domain", self.file, metadata)
+        self._metadata = metadata
+        return metadata
+
+    def refresh(self) -> bool:
+        """Drop parsed and memoized metadata if the domain file has changed
+        since metadata was loaded. Return whether metadata was dropped.
+        """
+        fingerprint = getattr(self, "_fingerprint", None)
+        if fingerprint is None or fingerprint == MetadataIndex.fingerprint(self.file):
+            return False
+        for name in (
+            "_config",
+            "_metadata",
+            "_fingerprint",
+            *_MEMOIZED_DOMAIN_ATTRIBUTES,
+        ):
+            self.__dict__.pop(name, None)
+        return True
+
+    def parse_metadata(self) -> dict[str, typing.Any]:
+        """Compile metadata from domain file header."""
+        config = self.config
+        main = config[self.name]
+        return {
+            "title": main.get("title", "No Title"),
+            "description": main.get("description", "No Description"),
+            "depends": [
+                dep.strip() for dep in main.get("depends", "").split("\n") if dep
+            ],
+            "soft_depends": [
+                dep.strip() for dep in main.get("soft-depends", "").split("\n") if dep
+            ],
+            "settings": [
+                [
+                    name[8:],
+                    config[name].get("description", "No Description"),
+                    config[name].get("default", "No Default"),
+                ]
+                for name in config.sections()
+                if name.startswith("setting.")
+            ],
+            "targets": [
+                [name[7:], config[name].get("description", "No Description")]
+                for name in config.sections()
+                if name.startswith("target.")
+            ],
+        }
+
+    @functools.cached_property
     def title(self) -> str:
-        return self.config[self.name].get("title", "No Title")
+        return self.metadata["title"]
 
-    @property
+    @functools.cached_property
     def description(self) -> str:
-        return self.config[self.name].get("description", "No Description")
-
-    @property
-    def depends(self) -> list[str]:
-        return [
-            dep.strip()
-            for dep in self.config[self.name].get("depends", "").split("\n")
-            if dep
-        ]
+        return self.metadata["description"]
+
+    @functools.cached_property
+    def depends(self) -> tuple[str, ...]:
+        return tuple(self.metadata["depends"])
+
+    @functools.cached_property
+    def soft_depends(self) -> tuple[str, ...]:
+        return tuple(self.metadata["soft_depends"])
+
+    @functools.cached_property
+    def settings(self) -> tuple[Setting, ...]:
+        return tuple(
+            Setting(name=name, description=description, default=default)
+            for name, description, default in self.metadata["settings"]
+        )
+
+    @functools.cached_property
+    def targets(self) -> tuple[Target, ...]:
+        return tuple(
+            Target(name=name, description=description)
+            for name, description in self.metadata["targets"]
+        )
 
-    @property
-    def soft_depends(self) -> list[str]:
-        return [
-            dep.strip()
-            for dep in self.config[self.name].get("soft-depends", "").split("\n")
-            if dep
-        ]
-
-    @property
-    def settings(self) -> list[Setting]:
-        config = self.config
-        return [
-            Setting(
-                name=name[8:],
-                description=config[name].get("description", "No Description"),
-                default=config[name].get("default", "No Default"),
-            )
-            for name in config.sections()
-            if name.startswith("setting.")
-        ]
+    def write_to(self, fd: typing.TextIO):
+        fd.writelines(self.read_body())
 
-    @property
-    def targets(self) -> list[Target]:
-        config = self.config
-        return [
-            Target(
-                name=name[7:],
-                description=config[name].get("description", "No Description"),
-            )
-            for name in config.sections()
-            if name.startswith("target.")
-        ]
 
-    def write_to(self, fd: typing.TextIO):
-        leading_blankline = True
-        for line in self.file_data:
-            if line.startswith("#:"):
-                continue
-            if not line.strip().strip("\n") and leading_blankline:
-                continue
-            else:
-                leading_blankline = False
-            fd.write(line)
+_MEMOIZED_DOMAIN_ATTRIBUTES = (
+    "title",
+    "description",
+    "depends",
+    "soft_depends",
+    "settings",
+    "targets",
+)
 
 
 @dataclass(unsafe_hash=True)
@@ -138,50 +199,227 @@ class Topic:
     name: str
     directory: Path
 
-    def __post_init__(self) -> None:
-        config = configparser.ConfigParser(default_section="metadata")
-        config.read(self.directory / "metadata.ini")
-        self.title = config.get("metadata", "title")
-        self.description = config.get("metadata", "description")
+    @property
+    def metadata(self) -> dict[str, str]:
+        """Topic metadata. Served from the metadata index if ``metadata.ini``
+        has not changed since it was indexed.
+        """
+        if (_metadata := getattr(self, "_metadata", None)) is not None:
+            return _metadata
+        index = get_metadata_index()
+        metadata_file = self.directory / "metadata.ini"
+        metadata = index.get("topic", metadata_file)
+        if metadata is None:
+            config = configparser.ConfigParser(default_section="metadata")
+            config.read(metadata_file)
+            metadata = {
+                "title": config.get("metadata", "title"),
+                "description": config.get("metadata", "description"),
+            }
+            index.set("topic", metadata_file, metadata)
+        self._metadata = metadata
+        return metadata
 
     @property
-    def domains(self) -> list[Domain]:
-        return [
-            Domain(
+    def title(self) -> str:
+        return self.metadata["title"]
+
+    @property
+    def description(self) -> str:
+        return self.metadata["description"]
+
+    @property
+    def domain_names(self) -> list[str]:
+        """Sorted names of the domains contained in topic directory."""
+        index = get_metadata_index()
+        names = index.get("directory", self.directory)
+        if names is None:
+            names = [
+                name.stem
+                for name in sorted(self.directory.iterdir())
+                if name.suffix == ".mk"
+            ]
+            index.set("directory", self.directory, names)
+        return names
+
+    @property
+    def domain_map(self) -> dict[str, Domain]:
+        """Domains of this topic by name. Created once per topic instance,
+        thus each domain is represented by exactly one ``Domain`` object.
+        """
+        if (_domain_map := getattr(self, "_domain_map", None)) is not None:
+            return _domain_map
+        self._domain_map: dict[str, Domain] = {
+            name: Domain(
                 topic=self.name,
-                name=name.stem,
-                file=self.directory / name,
+                name=name,
+                file=self.directory / f"{name}.mk",
             )
-            for name in sorted(self.directory.iterdir())
-            if name.suffix == ".mk"
-        ]
+            for name in self.domain_names
+        }
+        return self._domain_map
+
+    @property
+    def domains(self) -> list[Domain]:
+        return list(self.domain_map.values())
 
     def domain(self, name: str) -> Domain | None:
-        for domain in self.domains:
-            if domain.name == name:
-                return domain
-        return None
+        return self.domain_map.get(name)
+
+
+class Registry:
+    """Registry of topics and domains with constant time lookups.
+
+    Topics registered as entry points are loaded lazily. The entry point name
+    is expected to match the topic name, so requesting a topic only imports
+    the module providing it. Topics are listed in the order they were passed,
+    independent of the order they got loaded.
+    """
+
+    def __init__(
+        self,
+        topics: list[Topic] | None = None,
+        entry_points: list[EntryPoint] | None = None,
+    ) -> None:
+        self._topics = {topic.name: topic for topic in topics or []}
+        self._entry_points = {ep.name: ep for ep in entry_points or []}
+        # topics or entry point names in passed order, entry points names get
+        # replaced by their topic once loaded
+        self._order: dict[str, Topic | None] = {
+            **{topic.name: topic for topic in topics or []},
+            **dict.fromkeys(self._entry_points),
+        }
+        self._domains: dict[str, Domain] = {}
+        self.dependencies = DependencyTable(self)
+
+    def _load(self, name: str) -> None:
+        topic = self._entry_points.pop(name).load()
+        self._order[name] = topic
+        self._topics.setdefault(topic.name, topic)
+
+    def _load_all(self) -> None:
+        for name in list(self._entry_points):
+            self._load(name)
+
+    @property
+    def topics(self) -> list[Topic]:
+        self._load_all()
+        names = dict.fromkeys(topic.name for topic in self._order.values() if topic)
+        return [self._topics[name] for name in names]
+
+    def topic(self, name: str) -> Topic:
+        if name not in self._topics and name in self._entry_points:
+            self._load(name)
+        if name not in self._topics:
+            # topic might be registered with a different entry point name
+            self._load_all()
+        try:
+            return self._topics[name]
+        except KeyError:
+            raise AttributeError(f"No such topic: {name}") from None
+
+    def domain(self, fqn: str) -> Domain:
+        """Lookup domain. Metadata of a domain whose file changed since it
+        was loaded gets dropped, together with the dependency table.
+        """
+        if (domain := self._domains.get(fqn)) is not None:
+            if domain.refresh():
+                self.dependencies = DependencyTable(self)
+            return domain
+        topic_name, name = fqn.split(".")
+        domain = self.topic(topic_name).domain(name)
+        if not domain:
+            raise AttributeError(f"No such domain: {fqn}")
+        self._domains[fqn] = domain
+        return domain
+
+
+class DependencyTable:
+    """Transitive dependency closure and reverse dependencies of registered
+    domains, with hard and soft dependencies kept separate.
+
+    The closure of a domain gets computed on first request. Reverse
+    dependencies are computed once for all registered domains. The registry
+    replaces the table if a domain file changed.
+    """
+
+    def __init__(self, registry: Registry) -> None:
+        self.registry = registry
+        self._closure: dict[str, frozenset[str]] = {}
+        self._required_by: dict[str, frozenset[str]] | None = None
+        self._soft_required_by: dict[str, frozenset[str]] | None = None
+
+    def depends(self, fqn: str) -> frozenset[str]:
+        """Transitive hard dependencies of domain."""
+        if (closure := self._closure.get(fqn)) is not None:
+            # looking up the domains refreshes changed ones
+            for name in (fqn, *closure):
+                self.registry.domain(name)
+            if self.registry.dependencies is self:
+                return closure
+            return self.registry.dependencies.depends(fqn)
+        found: set[str] = set()
+        to_check = list(self.registry.domain(fqn).depends)
+        while to_check:
+            current_fqn = to_check.pop()
+            if current_fqn in found:
+                continue
+            found.add(current_fqn)
+            to_check.extend(self.registry.domain(current_fqn).depends)
+        closure = self._closure[fqn] = frozenset(found - {fqn})
+        return closure
+
+    def soft_depends(self, fqn: str) -> frozenset[str]:
+        """Soft dependencies of domain."""
+        return frozenset(self.registry.domain(fqn).soft_depends)
+
+    def _compute_reverse(self) -> None:
+        required_by: dict[str, set[str]] = {}
+        soft_required_by: dict[str, set[str]] = {}
+        for topic in self.registry.topics:
+            for domain in topic.domains:
+                for dependency_name in self.depends(domain.fqn):
+                    required_by.setdefault(dependency_name, set()).add(domain.fqn)
+                for dependency_name in domain.soft_depends:
+                    soft_required_by.setdefault(dependency_name, set()).add(domain.fqn)
+        self._required_by = {
+            fqn: frozenset(value) for fqn, value in required_by.items()
+        }
+        self._soft_required_by = {
+            fqn: frozenset(value) for fqn, value in soft_required_by.items()
+        }
+
+    def required_by(self, fqn: str) -> frozenset[str]:
+        """Domains which depend transitive on domain."""
+        if self._required_by is None:
+            self._compute_reverse()
+        return self._required_by.get(fqn, frozenset())  # type: ignore
+
+    def soft_required_by(self, fqn: str) -> frozenset[str]:
+        """Domains which soft depend on domain."""
+        if self._soft_required_by is None:
+            self._compute_reverse()
+        return self._soft_required_by.get(fqn, frozenset())  # type: ignore
+
+
+@functools.lru_cache(maxsize=1)
+def get_registry() -> Registry:
+    """Return process wide registry of all topics registered via entry
+    points.
+    """
+    return Registry(entry_points=list(entry_points(group="mxmake.topics")))
 
 
-@functools.lru_cache(maxsize=4096)
 def load_topics() -> list[Topic]:
-    return [ep.load() for ep in load_eps_by_group("mxmake.topics")]
+    return get_registry().topics
 
 
 def get_topic(name: str) -> Topic:
-    for topic in load_topics():
-        if topic.name == name:
-            return topic
-    raise AttributeError(f"No such topic: {name}")
+    return get_registry().topic(name)
 
 
 def get_domain(fqn: str) -> Domain:
-    topic_name, name = fqn.split(".")
-    topic = get_topic(topic_name)
-    domain = topic.domain(name)
-    if not domain:
-        raise AttributeError(f"No such domain: {fqn}")
-    return domain
+    return get_registry().domain(fqn)
 
 
 class DomainConflictError(Exception):
@@ -195,9 +433,12 @@ class DomainConflictError(Exception):
 
 
 class CircularDependencyDomainError(Exception):
-    def __init__(self, domains: list[Domain]):
+    def __init__(self, domains: list[Domain], cycle: list[str] | None = None):
         msg = f"Domains define circular dependencies: {domains}"
+        if cycle:
+            msg += f" (cycle: {' -> '.join(cycle)})"
         super().__init__(msg)
+        self.cycle = cycle
 
 
 class MissingDependencyDomainError(Exception):
@@ -206,11 +447,42 @@ class MissingDependencyDomainError(Exception):
         super().__init__(msg)
 
 
+def _find_cycle(domains: list[Domain], unresolved: set[str]) -> list[str]:
+    """Return dependency path of a cycle among unresolved domains.
+
+    Each unresolved domain has at least one unresolved dependency, so following
+    them always ends in a cycle.
+    """
+    by_fqn = {domain.fqn: domain for domain in domains}
+    path: list[str] = []
+    visited: dict[str, int] = {}
+    fqn = next(domain.fqn for domain in domains if domain.fqn in unresolved)
+    while fqn not in visited:
+        visited[fqn] = len(path)
+        path.append(fqn)
+        fqn = next(
+            dependency_name
+            for dependency_name in by_fqn[fqn].runtime_depends
+            if dependency_name in unresolved
+        )
+    return [*path[visited[fqn] :], fqn]
+
+
 def resolve_domain_dependencies(
     domains: list[Domain],
+    compat: bool = True,
 ) -> list[Domain]:
     """Return given domains ordered by dependencies.
 
+    Domains get resolved in ``O(V+E)`` using Kahn's algorithm. Whenever more
+    than one domain is ready, the one listed first in ``domains`` wins.
+
+    If ``compat`` is ``True``, the resulting order is identical to the one of
+    prior mxmake versions, which avoids churn in generated Makefiles: Domains
+    without dependencies come first, each other domain gets placed directly
+    behind its last placed dependency. Otherwise domains are plainly listed in
+    the order they get ready.
+
     :raise DomainConflictError: Domain list contains conflicting names.
     :raise MissingDependencyDomainError: Dependency domain not included.
     :raise CircularDependencyDomainError: Circular dependencies defined.
@@ -219,40 +491,56 @@ def resolve_domain_dependencies(
     counter = Counter(names)
     if len(domains) != len(counter):
         raise DomainConflictError(counter)
-    ret = []
-    handled = {}
-    for domain in domains[:]:
-        if not domain.runtime_depends:
-            ret.append(domain)
-            handled[domain.fqn] = domain
-            domains.remove(domain)
-        else:
-            for dependency_name in domain.runtime_depends:
-                if dependency_name not in names:
-                    raise MissingDependencyDomainError(domain)
-    count = len(domains)
-    while count > 0:
-        count -= 1
-        for domain in domains[:]:
-            hook_idx = 0
-            not_yet = False
-            for dependency_name in domain.runtime_depends:
-                if dependency_name in handled:
-                    dependency = handled[dependency_name]
-                    dep_idx = ret.index(dependency)
-                    hook_idx = dep_idx if dep_idx > hook_idx else hook_idx
-                else:
-                    not_yet = True
-                    break
-            if not_yet:
-                continue
-            ret.insert(hook_idx + 1, domain)
-            handled[domain.fqn] = domain
-            domains.remove(domain)
-            break
-    if domains:
-        raise CircularDependencyDomainError(domains)
-    return ret
+    positions = {fqn: idx for idx, fqn in enumerate(names)}
+    # positions of dependent domains and number of unresolved dependencies
+    dependents: list[list[int]] = [[] for _ in domains]
+    pending: list[int] = []
+    for idx, domain in enumerate(domains):
+        for dependency_name in domain.runtime_depends:
+            if dependency_name not in positions:
+                raise MissingDependencyDomainError(domain)
+            dependents[positions[dependency_name]].append(idx)
+        pending.append(len(domain.runtime_depends))
+    ready = [idx for idx, count in enumerate(pending) if not count]
+    resolved: list[int] = []
+
+    def release(idx: int) -> None:
+        resolved.append(idx)
+        for dependent in dependents[idx]:
+            pending[dependent] -= 1
+            if not pending[dependent]:
+                heapq.heappush(ready, dependent)
+
+    # In compat mode, each placed domain gets a sort key. A domain placed
+    # behind its last placed dependency extends the dependency key, with
+    # later placed domains sorting first, as they get inserted directly
+    # behind the dependency.
+    keys: dict[int, tuple[int, ...]] = {}
+    placed_behind: Counter[int] = Counter()
+    if compat:
+        roots, ready = ready, []
+        for root, idx in enumerate(roots):
+            keys[idx] = (root,)
+            release(idx)
+    while ready:
+        idx = heapq.heappop(ready)
+        if compat:
+            anchor = max(
+                (positions[name] for name in domains[idx].runtime_depends),
+                key=keys.__getitem__,
+            )
+            placed_behind[anchor] += 1
+            keys[idx] = (*keys[anchor], -placed_behind[anchor])
+        release(idx)
+    if len(resolved) != len(domains):
+        unresolved = {names[idx] for idx, count in enumerate(pending) if count}
+        raise CircularDependencyDomainError(
+            [domain for domain in domains if domain.fqn in unresolved],
+            cycle=_find_cycle(domains, unresolved),
+        )
+    if compat:
+        resolved.sort(key=keys.__getitem__)
+    return [domains[idx] for idx in resolved]
 
 
 def collect_missing_dependencies(
@@ -261,16 +549,12 @@ def collect_missing_dependencies(
     """Expect a list of domain instances, and add all missing depencecy
     domains.
     """
-    to_check = {domain.fqn for domain in domains}
-    checked = set()
-    while to_check:
-        current_fqn = to_check.pop()
-        checked.add(current_fqn)
-        new_depends = set(get_domain(current_fqn).depends) - checked
-        if new_depends:
-            to_check.update(new_depends)
+    dependencies = get_registry().dependencies
+    fqns = {domain.fqn for domain in domains}
+    for domain in domains:
+        fqns.update(dependencies.depends(domain.fqn))
     return sorted(
-        [get_domain(domain_name) for domain_name in checked],
+        [get_domain(domain_name) for domain_name in fqns],
         key=operator.attrgetter("fqn"),
     )
 
@@ -280,9 +564,9 @@ def set_domain_runtime_depends(domains: list[Domain]) -> None:
     domain, which consists of the hard dependencies and the soft dependencies
     which are contained in domains.
     """
-    all_fqns = [domain.fqn for domain in domains]
+    all_fqns = {domain.fqn for domain in domains}
     for domain in domains:
-        runtime_depends = domain.depends
+        runtime_depends = list(domain.depends)
         for fqn in domain.soft_depends:
             if fqn in all_fqns:
                 runtime_depends.append(fqn)
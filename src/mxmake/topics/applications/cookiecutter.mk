@@ -17,7 +17,8 @@
 ##############################################################################
 
 COOKIECUTTER_TARGET:=$(SENTINEL_FOLDER)/cookiecutter.sentinel
-$(COOKIECUTTER_TARGET): $(MXENV_TARGET)
+$(COOKIECUTTER_TARGET): $(call domain_settings,applications.cookiecutter) $(MXENV_TARGET)
+	@$(call acquire_lock,venv)
 	@echo "Install cookiecutter"
 	@$(PYTHON_PACKAGE_COMMAND) install "cookiecutter>=2.6.0"
 	@touch $(COOKIECUTTER_TARGET)
@@ -31,6 +32,7 @@ cookiecutter-dirty:
 
 .PHONY: cookiecutter-clean
 cookiecutter-clean: cookiecutter-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y cookiecutter || :
 	@rm -f $(COOKIECUTTER_TARGET)
 
@@ -19,7 +19,8 @@
 ##############################################################################
 
 TWISTED_TARGET:=$(SENTINEL_FOLDER)/twisted.sentinel
-$(TWISTED_TARGET): $(MXENV_TARGET)
+$(TWISTED_TARGET): $(call domain_settings,applications.twisted) $(MXENV_TARGET)
+	@$(call acquire_lock,venv)
 	@echo "Install twisted"
 	@$(PYTHON_PACKAGE_COMMAND) install Twisted
 	@touch $(TWISTED_TARGET)
@@ -35,6 +36,7 @@ twisted-dirty:
 
 .PHONY: twisted-clean
 twisted-clean: twisted-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y Twisted || :
 
 INSTALL_TARGETS+=$(TWISTED_TARGET)
@@ -43,7 +43,8 @@
 ##############################################################################
 
 ZEST_RELEASER_TARGET:=$(SENTINEL_FOLDER)/zest-releaser.sentinel
-$(ZEST_RELEASER_TARGET): $(MXENV_TARGET)
+$(ZEST_RELEASER_TARGET): $(call domain_settings,applications.zest-releaser) $(MXENV_TARGET)
+	@$(call acquire_lock,venv)
 	@echo "Install zest.releaser"
 	@$(PYTHON_PACKAGE_COMMAND) install zest.releaser
 	@touch $(ZEST_RELEASER_TARGET)
@@ -74,6 +75,7 @@ zest-releaser-dirty:
 
 .PHONY: zest-releaser-clean
 zest-releaser-clean: zest-releaser-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y zest.releaser || :
 
 INSTALL_TARGETS+=$(ZEST_RELEASER_TARGET)
@@ -77,7 +77,7 @@ endif
 ${ZOPE_CONFIGURATION_FILE}:
 	@touch ${ZOPE_CONFIGURATION_FILE}
 
-$(ZOPE_INSTANCE_TARGET): $(COOKIECUTTER_TARGET) $(ZOPE_CONFIGURATION_FILE)
+$(ZOPE_INSTANCE_TARGET): $(call domain_settings,applications.zope) $(COOKIECUTTER_TARGET) $(call hashed_inputs,zope,$(ZOPE_CONFIGURATION_FILE))
 	@echo Create Plone/Zope configuration from $(ZOPE_TEMPLATE) to $(ZOPE_INSTANCE_FOLDER)
 	@cookiecutter -f --no-input ${ZOPE_COOKIECUTTER_TEMPLATE_OPTIONS} --config-file $(ZOPE_CONFIGURATION_FILE) --output-dir $(ZOPE_BASE_FOLDER) $(ZOPE_TEMPLATE)
 
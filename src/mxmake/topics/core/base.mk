@@ -68,6 +68,18 @@
 #:  For monorepo setups, set to subdirectory name (e.g., `backend`).
 #:  Future-proofed for multi-language monorepos (e.g., PROJECT_PATH_NODEJS).
 #:default =
+#:
+#:[setting.MXMAKE_HASH_STAMPS]
+#:description = Rebuild targets only if the content of their input files
+#:  changed instead of comparing modification times. Useful if modification
+#:  times get reset, e.g. by `git checkout` or by restoring CI caches.
+#:default = false
+#:
+#:[setting.MXMAKE_JOBS]
+#:description = Number of jobs make runs in parallel, like `make -j`. Output
+#:  of each target is printed at once when it finished. Requires GNU make 4.0
+#:  or newer. Leave empty to run jobs as given on the command line.
+#:default =
 
 export PATH:=$(if $(EXTRA_PATH),$(EXTRA_PATH):,)$(PATH)
 
@@ -83,13 +95,68 @@ SHELL:=bash
 .DELETE_ON_ERROR:
 MAKEFLAGS+=--warn-undefined-variables
 MAKEFLAGS+=--no-builtin-rules
+ifneq ("$(MXMAKE_JOBS)","")
+MAKEFLAGS+=--jobs=$(MXMAKE_JOBS) --output-sync=target
+endif
 
 # mxmake folder
 MXMAKE_FOLDER?=.mxmake
 
+# Locks of resources used by targets of multiple domains, which must not run
+# concurrently if make runs multiple jobs, e.g. installing packages into the
+# virtual environment. Use `@$(call acquire_lock,name)` as first line of a
+# recipe. The lock is released when the recipe exits. Locks of crashed
+# processes are removed.
+LOCK_FOLDER?=$(MXMAKE_FOLDER)/locks
+acquire_lock=mkdir -p $(LOCK_FOLDER) \
+	&& until mkdir $(LOCK_FOLDER)/$(1) 2>/dev/null; do \
+		kill -0 "$$(cat $(LOCK_FOLDER)/$(1)/pid 2>/dev/null || echo $$$$)" 2>/dev/null \
+			|| rm -rf $(LOCK_FOLDER)/$(1); \
+		sleep 0.1; \
+	done \
+	&& echo $$$$ > $(LOCK_FOLDER)/$(1)/pid \
+	&& trap 'rm -rf $(LOCK_FOLDER)/$(1)' EXIT
+
 # Sentinel files
 SENTINEL_FOLDER?=$(MXMAKE_FOLDER)/sentinels
 SENTINEL?=$(SENTINEL_FOLDER)/about.txt
-$(SENTINEL): $(firstword $(MAKEFILE_LIST))
+
+# Input files of a target. Use as `$(call hashed_inputs,name,files)` in the
+# prerequisites of a target. If `MXMAKE_HASH_STAMPS` is `true`, it is replaced
+# by the hash stamp `$(SENTINEL_FOLDER)/name.hash` which is only written if
+# the checksums of the files changed.
+define hash_stamp_rule
+$(SENTINEL_FOLDER)/$(1).hash: $(2) .mxmake-force
+	@mkdir -p $(SENTINEL_FOLDER)
+	@hash="$$$$(cksum /dev/null $(2))"
+	@if [[ ! -e $$@ || "$$$$(< $$@)" != "$$$$hash" ]]; then echo "$$$$hash" > $$@; fi
+endef
+
+ifeq ("$(MXMAKE_HASH_STAMPS)","true")
+hashed_inputs=$(eval $(call hash_stamp_rule,$(1),$(2)))$(SENTINEL_FOLDER)/$(1).hash
+else
+hashed_inputs=$(2)
+endif
+
+.mxmake-force:
+
+# Settings fingerprint of a domain. The generated Makefile calls
+# `settings_fingerprint` after each domain section with the domain fqn, a hash
+# of the section and the names of the domain settings. The fingerprint
+# `$(SENTINEL_FOLDER)/fqn.settings` is only written if the section or the
+# effective value of a setting changed. Domain targets depend on it with
+# `$(call domain_settings,fqn)`, so they do not rebuild on unrelated changes
+# of the Makefile.
+define settings_fingerprint_rule
+$(SENTINEL_FOLDER)/$(1).settings: .mxmake-force
+	@mkdir -p $(SENTINEL_FOLDER)
+	@fingerprint='$(2) $$(subst ','\'',$$(foreach name,$(3),$$(name)=$$($$(name))))'
+	@if [[ ! -e $$@ || "$$$$(< $$@)" != "$$$$fingerprint" ]]; then echo "$$$$fingerprint" > $$@; fi
+endef
+
+settings_fingerprint=$(eval $(call settings_fingerprint_rule,$(1),$(2),$(3)))
+domain_settings=$(SENTINEL_FOLDER)/$(1).settings
+
+$(SENTINEL): $(call hashed_inputs,makefile,$(firstword $(MAKEFILE_LIST)))
 	@mkdir -p $(SENTINEL_FOLDER)
 	@echo "Sentinels for the Makefile process." > $(SENTINEL)
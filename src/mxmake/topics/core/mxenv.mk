@@ -102,9 +102,15 @@ else
 PYTHON_PACKAGE_COMMAND=$(MXENV_PYTHON) -m pip
 endif
 
-# Auto-detect global uv availability (simple existence check)
+# Auto-detect global uv availability (simple existence check). Looks up uv in
+# PATH without spawning a shell. The virtual environment is excluded, a uv
+# installed there is not global. Directories named uv are skipped, the
+# executable bit is checked when building the environment.
 ifeq ("$(PYTHON_PACKAGE_INSTALLER)","uv")
-UV_AVAILABLE:=$(shell command -v uv >/dev/null 2>&1 && echo "true" || echo "false")
+UV_SEARCH_PATH:=$(filter-out $(if $(VENV_FOLDER),$(addprefix $(abspath $(VENV_FOLDER))/,bin Scripts)),$(subst :, ,$(PATH)))
+UV_CANDIDATES:=$(wildcard $(addsuffix /uv,$(UV_SEARCH_PATH)) $(addsuffix /uv.exe,$(UV_SEARCH_PATH)))
+UV_EXECUTABLE:=$(firstword $(filter-out $(patsubst %/.,%,$(wildcard $(addsuffix /.,$(UV_CANDIDATES)))),$(UV_CANDIDATES)))
+UV_AVAILABLE:=$(if $(UV_EXECUTABLE),true,false)
 else
 UV_AVAILABLE:=false
 endif
@@ -114,24 +120,31 @@ endif
 # - both vars can be false or
 # - one of them can be true,
 # - but never boths.
-USE_GLOBAL_UV:=$(shell [[ "$(PYTHON_PACKAGE_INSTALLER)" == "uv" && "$(UV_AVAILABLE)" == "true" ]] && echo "true" || echo "false")
-USE_LOCAL_UV:=$(shell [[ "$(PYTHON_PACKAGE_INSTALLER)" == "uv" && "$(UV_AVAILABLE)" == "false" ]] && echo "true" || echo "false")
-
-# Check if global UV is outdated (non-blocking warning)
-ifeq ("$(USE_GLOBAL_UV)","true")
-UV_OUTDATED:=$(shell uv self update --dry-run 2>&1 | grep -q "Would update" && echo "true" || echo "false")
+USE_GLOBAL_UV:=false
+USE_LOCAL_UV:=false
+ifeq ("$(PYTHON_PACKAGE_INSTALLER)","uv")
+ifeq ("$(UV_AVAILABLE)","true")
+USE_GLOBAL_UV:=true
 else
-UV_OUTDATED:=false
+USE_LOCAL_UV:=true
+endif
 endif
 
+# Check if global uv is outdated at most once a day when building the
+# environment. It requires network access, thus is not done on parse time.
+UV_OUTDATED_STAMP:=$(SENTINEL_FOLDER)/uv-outdated.stamp
+
 MXENV_TARGET:=$(SENTINEL_FOLDER)/mxenv.sentinel
-$(MXENV_TARGET): $(SENTINEL)
+$(MXENV_TARGET): $(call domain_settings,core.mxenv) | $(SENTINEL)
+	@$(call acquire_lock,venv)
 	# Validation: Check Python version if not using global uv
 ifneq ("$(USE_GLOBAL_UV)","true")
 	@$(PRIMARY_PYTHON) -c "import sys; vi = sys.version_info; sys.exit(1 if (int(vi[0]), int(vi[1])) >= tuple(map(int, '$(PYTHON_MIN_VERSION)'.split('.'))) else 0)" \
 		&& echo "Need Python >= $(PYTHON_MIN_VERSION)" && exit 1 || :
 else
 	@echo "Using global uv for Python $(UV_PYTHON)"
+	@[[ -x "$(UV_EXECUTABLE)" ]] \
+		|| { echo "Global uv at '$(UV_EXECUTABLE)' is not executable"; exit 1; }
 endif
 	# Validation: Check VENV_FOLDER is set if venv enabled
 	@[[ "$(VENV_ENABLED)" == "true" && "$(VENV_FOLDER)" == "" ]] \
@@ -140,8 +153,13 @@ endif
 	@[[ "$(VENV_ENABLED)" == "false" && "$(PYTHON_PACKAGE_INSTALLER)" == "uv" ]] \
 		&& echo "Package installer uv does not work with a global Python interpreter." && exit 1 || :
 	# Warning: Notify if global UV is outdated
-ifeq ("$(UV_OUTDATED)","true")
-	@echo "WARNING: A newer version of uv is available. Run 'uv self update' to upgrade."
+ifeq ("$(USE_GLOBAL_UV)","true")
+	@if [[ -z "$$(find $(UV_OUTDATED_STAMP) -mmin -1440 2>/dev/null)" ]]; then \
+		touch $(UV_OUTDATED_STAMP); \
+		uv self update --dry-run 2>&1 | grep -q "Would update" \
+			&& echo "WARNING: A newer version of uv is available. Run 'uv self update' to upgrade." \
+			|| :; \
+	fi
 endif
 
 	# Create virtual environment
@@ -181,6 +199,7 @@ mxenv-dirty:
 
 .PHONY: mxenv-clean
 mxenv-clean: mxenv-dirty
+	@$(call acquire_lock,venv)
 ifeq ("$(VENV_ENABLED)", "true")
 ifeq ("$(VENV_CREATE)", "true")
 	@rm -rf $(VENV_FOLDER)
@@ -190,6 +209,18 @@ else
 	@$(PYTHON_PACKAGE_COMMAND) uninstall -y $(MXMAKE)
 endif
 
+# Python tools installed with a single installer invocation. Domains add their
+# requirements to `TOOL_REQUIREMENTS` and use `TOOLS_TARGET` as install target.
+# The tools get reinstalled if the aggregated requirements changed.
+TOOL_REQUIREMENTS?=
+TOOLS_TARGET:=$(SENTINEL_FOLDER)/tools.sentinel
+$(call settings_fingerprint,tools,tools,TOOL_REQUIREMENTS)
+$(TOOLS_TARGET): $(call domain_settings,tools) $(MXENV_TARGET)
+	@$(call acquire_lock,venv)
+	@echo "Install $(strip $(TOOL_REQUIREMENTS))"
+	@$(PYTHON_PACKAGE_COMMAND) install $(TOOL_REQUIREMENTS)
+	@touch $(TOOLS_TARGET)
+
 INSTALL_TARGETS+=mxenv
 DIRTY_TARGETS+=mxenv-dirty
 CLEAN_TARGETS+=mxenv-clean
@@ -48,7 +48,7 @@ endif
 LOCAL_PACKAGE_FILES:=$(wildcard $(PYTHON_PROJECT_PREFIX)pyproject.toml $(PYTHON_PROJECT_PREFIX)setup.cfg $(PYTHON_PROJECT_PREFIX)setup.py $(PYTHON_PROJECT_PREFIX)requirements.txt $(PYTHON_PROJECT_PREFIX)constraints.txt)
 
 FILES_TARGET:=requirements-mxdev.txt
-$(FILES_TARGET): $(PROJECT_CONFIG) $(MXENV_TARGET) $(SOURCES_TARGET) $(LOCAL_PACKAGE_FILES)
+$(FILES_TARGET): $(call domain_settings,core.mxfiles) $(call hashed_inputs,mxfiles,$(PROJECT_CONFIG) $(LOCAL_PACKAGE_FILES)) $(MXENV_TARGET) $(SOURCES_TARGET)
 	@echo "Create project files"
 	@mkdir -p $(MXMAKE_FILES)
 	$(call set_mxfiles_env,$(MXMAKE_FILES))
@@ -63,6 +63,7 @@ mxfiles: $(FILES_TARGET)
 .PHONY: mxfiles-dirty
 mxfiles-dirty:
 	@touch $(PROJECT_CONFIG)
+	@rm -f $(SENTINEL_FOLDER)/mxfiles.hash $(SENTINEL_FOLDER)/sources.hash
 
 .PHONY: mxfiles-clean
 mxfiles-clean: mxfiles-dirty
@@ -22,12 +22,12 @@
 # packages
 ##############################################################################
 
-# additional sources targets which requires package re-install on change
--include $(MXMAKE_FILES)/additional_sources_targets.mk
-ADDITIONAL_SOURCES_TARGETS?=
-
 INSTALLED_PACKAGES=$(MXMAKE_FILES)/installed.txt
 
+# requirements and constraints of the last install, only changed requirements
+# get installed on subsequent runs
+PACKAGES_STATE=$(MXMAKE_FILES)/packages.json
+
 ifeq ("$(PACKAGES_ALLOW_PRERELEASES)","true")
 ifeq ("$(PYTHON_PACKAGE_INSTALLER)","uv")
 PACKAGES_PRERELEASES=--prerelease=allow
@@ -39,10 +39,36 @@ PACKAGES_PRERELEASES=
 endif
 
 PACKAGES_TARGET:=$(INSTALLED_PACKAGES)
-$(PACKAGES_TARGET): $(FILES_TARGET) $(ADDITIONAL_SOURCES_TARGETS)
+
+# install changed requirements and source packages with changed files. mxmake
+# in the virtual environment is controlled by the MXMAKE setting and might
+# not provide install-packages (mxmake < 2.2.0), install all packages then
+define install_packages
+@if $(MXENV_PYTHON) -m mxmake install-packages --help >/dev/null 2>&1; then
+	$(MXENV_PYTHON) -m mxmake install-packages \
+		--installer="$(PYTHON_PACKAGE_COMMAND)" \
+		--install-options="$(PACKAGES_PRERELEASES)" \
+		--state=$(PACKAGES_STATE) \
+		--installed=$(INSTALLED_PACKAGES) \
+		$(FILES_TARGET)
+else
+	$(PYTHON_PACKAGE_COMMAND) install $(PACKAGES_PRERELEASES) -r $(FILES_TARGET)
+	$(PYTHON_PACKAGE_COMMAND) freeze > $(INSTALLED_PACKAGES)
+fi
+endef
+
+# additional sources targets which require re-installing the source package
+# on change. Stamps of source packages with changed files get touched, which
+# triggers the packages target
+-include $(MXMAKE_FILES)/additional_sources_targets.mk
+ADDITIONAL_SOURCES_TARGETS?=
+ADDITIONAL_SOURCES_PACKAGE_TARGETS?=
+
+$(PACKAGES_TARGET): $(call domain_settings,core.packages) $(FILES_TARGET) \
+		$(ADDITIONAL_SOURCES_PACKAGE_TARGETS)
+	@$(call acquire_lock,venv)
 	@echo "Install python packages"
-	@$(PYTHON_PACKAGE_COMMAND) install $(PACKAGES_PRERELEASES) -r $(FILES_TARGET)
-	@$(PYTHON_PACKAGE_COMMAND) freeze > $(INSTALLED_PACKAGES)
+	$(install_packages)
 	@touch $(PACKAGES_TARGET)
 
 .PHONY: packages
@@ -54,11 +80,13 @@ packages-dirty:
 
 .PHONY: packages-clean
 packages-clean:
+	@$(call acquire_lock,venv)
 	@test -e $(FILES_TARGET) \
 		&& test -e $(MXENV_PYTHON) \
 		&& $(MXENV_PYTHON) -m pip uninstall -y -r $(FILES_TARGET) \
 		|| :
-	@rm -f $(PACKAGES_TARGET)
+	@rm -f $(PACKAGES_TARGET) $(PACKAGES_STATE) \
+		$(ADDITIONAL_SOURCES_PACKAGE_TARGETS)
 
 INSTALL_TARGETS+=packages
 DIRTY_TARGETS+=packages-dirty
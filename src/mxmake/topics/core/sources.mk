@@ -18,7 +18,7 @@
 ##############################################################################
 
 SOURCES_TARGET:=$(SENTINEL_FOLDER)/sources.sentinel
-$(SOURCES_TARGET): $(PROJECT_CONFIG) $(MXENV_TARGET)
+$(SOURCES_TARGET): $(call domain_settings,core.sources) $(call hashed_inputs,sources,$(PROJECT_CONFIG)) $(MXENV_TARGET)
 	@echo "Checkout project sources"
 	@mxdev -f -c $(PROJECT_CONFIG)
 	@touch $(SOURCES_TARGET)
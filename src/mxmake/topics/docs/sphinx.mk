@@ -43,11 +43,8 @@ DOCS_TARGETS+=
 SPHINX_BIN=sphinx-build
 SPHINX_AUTOBUILD_BIN=sphinx-autobuild
 
-DOCS_TARGET:=$(SENTINEL_FOLDER)/sphinx.sentinel
-$(DOCS_TARGET): $(MXENV_TARGET)
-	@echo "Install Sphinx"
-	@$(PYTHON_PACKAGE_COMMAND) install -U sphinx sphinx-autobuild $(DOCS_REQUIREMENTS)
-	@touch $(DOCS_TARGET)
+TOOL_REQUIREMENTS+=sphinx sphinx-autobuild $(DOCS_REQUIREMENTS)
+DOCS_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: docs
 docs: $(DOCS_TARGET) $(DOCS_TARGETS)
@@ -70,6 +67,7 @@ docs-dirty:
 
 .PHONY: docs-clean
 docs-clean: docs-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y \
 		sphinx sphinx-autobuild $(DOCS_REQUIREMENTS) || :
 	@rm -rf $(DOCS_TARGET_FOLDER)
@@ -28,11 +28,8 @@
 # lingua
 ##############################################################################
 
-LINGUA_TARGET:=$(SENTINEL_FOLDER)/lingua.sentinel
-$(LINGUA_TARGET): $(MXENV_TARGET)
-	@echo "Install Lingua"
-	@$(PYTHON_PACKAGE_COMMAND) install chameleon lingua $(LINGUA_PLUGINS)
-	@touch $(LINGUA_TARGET)
+TOOL_REQUIREMENTS+=chameleon lingua $(LINGUA_PLUGINS)
+LINGUA_TARGET:=$(TOOLS_TARGET)
 
 PHONY: lingua-extract
 lingua-extract: $(LINGUA_TARGET)
@@ -50,6 +47,7 @@ lingua-dirty:
 
 .PHONY: lingua-clean
 lingua-clean: lingua-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y \
 		chameleon lingua $(LINGUA_PLUGINS) || :
 
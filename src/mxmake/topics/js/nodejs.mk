@@ -53,7 +53,8 @@ export PATH:=$(shell pwd)/$(NODEJS_PREFIX)/node_modules/.bin:$(PATH)
 
 
 NODEJS_TARGET:=$(SENTINEL_FOLDER)/nodejs.sentinel
-$(NODEJS_TARGET): $(SENTINEL)
+$(NODEJS_TARGET): $(call domain_settings,js.nodejs) | $(SENTINEL)
+	@$(call acquire_lock,node)
 	@echo "Install nodejs packages"
 	@test -z "$(NODEJS_DEV_PACKAGES)" \
 		&& echo "No dev packages to be installed" \
@@ -89,6 +90,7 @@ nodejs-dirty:
 
 .PHONY: nodejs-clean
 nodejs-clean: nodejs-dirty
+	@$(call acquire_lock,node)
 	@rm -rf $(NODEJS_PREFIX)/node_modules
 
 INSTALL_TARGETS+=nodejs
@@ -36,7 +36,7 @@
 SYSTEM_DEPENDENCIES+=libdb-dev libsasl2-dev
 
 OPENLDAP_TARGET:=$(SENTINEL_FOLDER)/openldap.sentinel
-$(OPENLDAP_TARGET): $(SENTINEL)
+$(OPENLDAP_TARGET): $(call domain_settings,ldap.openldap) | $(SENTINEL)
 	@echo "Building openldap server in '$(OPENLDAP_DIR)'"
 	@test -d $(OPENLDAP_DIR) || curl -o openldap-$(OPENLDAP_VERSION).tgz \
 		$(OPENLDAP_URL)/openldap-$(OPENLDAP_VERSION).tgz
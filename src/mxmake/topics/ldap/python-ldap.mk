@@ -22,7 +22,8 @@
 SYSTEM_DEPENDENCIES+=python3-dev libldap2-dev libssl-dev libsasl2-dev
 
 PYTHON_LDAP_TARGET:=$(SENTINEL_FOLDER)/python-ldap.sentinel
-$(PYTHON_LDAP_TARGET): $(MXENV_TARGET) $(OPENLDAP_TARGET)
+$(PYTHON_LDAP_TARGET): $(call domain_settings,ldap.python-ldap) $(MXENV_TARGET) $(OPENLDAP_TARGET)
+	@$(call acquire_lock,venv)
 	@$(PYTHON_PACKAGE_COMMAND) install \
 		--force-reinstall \
 		python-ldap
@@ -37,6 +38,7 @@ python-ldap-dirty:
 
 .PHONY: python-ldap-clean
 python-ldap-clean: python-ldap-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y python-ldap || :
 
 INSTALL_TARGETS+=python-ldap
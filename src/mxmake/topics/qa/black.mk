@@ -25,11 +25,8 @@ ifeq ($(BLACK_SRC),src)
 BLACK_SRC:=$(PYTHON_PROJECT_PREFIX)src
 endif
 
-BLACK_TARGET:=$(SENTINEL_FOLDER)/black.sentinel
-$(BLACK_TARGET): $(MXENV_TARGET)
-	@echo "Install Black"
-	@$(PYTHON_PACKAGE_COMMAND) install black
-	@touch $(BLACK_TARGET)
+TOOL_REQUIREMENTS+=black
+BLACK_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: black-check
 black-check: $(BLACK_TARGET)
@@ -38,6 +35,7 @@ black-check: $(BLACK_TARGET)
 
 .PHONY: black-format
 black-format: $(BLACK_TARGET)
+	@$(call acquire_lock,format)
 	@echo "Run black format"
 	@black $(BLACK_SRC)
 
@@ -47,6 +45,7 @@ black-dirty:
 
 .PHONY: black-clean
 black-clean: black-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y black || :
 
 INSTALL_TARGETS+=$(BLACK_TARGET)
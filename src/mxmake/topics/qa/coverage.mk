@@ -19,11 +19,8 @@
 # coverage
 ##############################################################################
 
-COVERAGE_TARGET:=$(SENTINEL_FOLDER)/coverage.sentinel
-$(COVERAGE_TARGET): $(TEST_TARGET)
-	@echo "Install Coverage"
-	@$(PYTHON_PACKAGE_COMMAND) install -U coverage
-	@touch $(COVERAGE_TARGET)
+TOOL_REQUIREMENTS+=coverage
+COVERAGE_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: coverage
 coverage: $(FILES_TARGET) $(SOURCES_TARGET) $(PACKAGES_TARGET) $(COVERAGE_TARGET)
@@ -37,6 +34,7 @@ coverage-dirty:
 
 .PHONY: coverage-clean
 coverage-clean: coverage-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y coverage || :
 	@rm -rf .coverage htmlcov
 
@@ -25,11 +25,8 @@ ifeq ($(ISORT_SRC),src)
 ISORT_SRC:=$(PYTHON_PROJECT_PREFIX)src
 endif
 
-ISORT_TARGET:=$(SENTINEL_FOLDER)/isort.sentinel
-$(ISORT_TARGET): $(MXENV_TARGET)
-	@echo "Install isort"
-	@$(PYTHON_PACKAGE_COMMAND) install isort
-	@touch $(ISORT_TARGET)
+TOOL_REQUIREMENTS+=isort
+ISORT_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: isort-check
 isort-check: $(ISORT_TARGET)
@@ -38,6 +35,7 @@ isort-check: $(ISORT_TARGET)
 
 .PHONY: isort-format
 isort-format: $(ISORT_TARGET)
+	@$(call acquire_lock,format)
 	@echo "Run isort format"
 	@isort $(ISORT_SRC)
 
@@ -47,6 +45,7 @@ isort-dirty:
 
 .PHONY: isort-clean
 isort-clean: isort-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y isort || :
 
 INSTALL_TARGETS+=$(ISORT_TARGET)
@@ -29,11 +29,8 @@ ifeq ($(MYPY_SRC),src)
 MYPY_SRC:=$(PYTHON_PROJECT_PREFIX)src
 endif
 
-MYPY_TARGET:=$(SENTINEL_FOLDER)/mypy.sentinel
-$(MYPY_TARGET): $(MXENV_TARGET)
-	@echo "Install mypy"
-	@$(PYTHON_PACKAGE_COMMAND) install mypy $(MYPY_REQUIREMENTS)
-	@touch $(MYPY_TARGET)
+TOOL_REQUIREMENTS+=mypy $(MYPY_REQUIREMENTS)
+MYPY_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: mypy
 mypy: $(PACKAGES_TARGET) $(MYPY_TARGET)
@@ -46,6 +43,7 @@ mypy-dirty:
 
 .PHONY: mypy-clean
 mypy-clean: mypy-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y mypy || :
 	@rm -rf .mypy_cache
 
@@ -29,11 +29,8 @@ ifeq ($(PYREFLY_SRC),src)
 PYREFLY_SRC:=$(PYTHON_PROJECT_PREFIX)src
 endif
 
-PYREFLY_TARGET:=$(SENTINEL_FOLDER)/pyrefly.sentinel
-$(PYREFLY_TARGET): $(MXENV_TARGET)
-	@echo "Install pyrefly"
-	@$(PYTHON_PACKAGE_COMMAND) install pyrefly $(PYREFLY_REQUIREMENTS)
-	@touch $(PYREFLY_TARGET)
+TOOL_REQUIREMENTS+=pyrefly $(PYREFLY_REQUIREMENTS)
+PYREFLY_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: pyrefly
 pyrefly: $(PACKAGES_TARGET) $(PYREFLY_TARGET)
@@ -46,6 +43,7 @@ pyrefly-dirty:
 
 .PHONY: pyrefly-clean
 pyrefly-clean: pyrefly-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y pyrefly || :
 
 INSTALL_TARGETS+=$(PYREFLY_TARGET)
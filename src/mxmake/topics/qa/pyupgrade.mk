@@ -29,14 +29,12 @@ ifeq ($(PYUPGRADE_SRC),src)
 PYUPGRADE_SRC:=$(PYTHON_PROJECT_PREFIX)src
 endif
 
-PYUPGRADE_TARGET:=$(SENTINEL_FOLDER)/pyupgrade.sentinel
-$(PYUPGRADE_TARGET): $(MXENV_TARGET)
-	@echo "Install pyupgrade"
-	@$(PYTHON_PACKAGE_COMMAND) install pyupgrade
-	@touch $(PYUPGRADE_TARGET)
+TOOL_REQUIREMENTS+=pyupgrade
+PYUPGRADE_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: pyupgrade-format
 pyupgrade-format: $(PYUPGRADE_TARGET)
+	@$(call acquire_lock,format)
 	@echo "Run pyupgrade format in: $(PYUPGRADE_SRC)"
 	@find $(PYUPGRADE_SRC) -name '*.py' -exec pyupgrade $(PYUPGRADE_PARAMETERS) {} +
 
@@ -46,6 +44,7 @@ pyupgrade-dirty:
 
 .PHONY: pyupgrade-clean
 pyupgrade-clean: pyupgrade-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y pyupgrade || :
 
 INSTALL_TARGETS+=$(PYUPGRADE_TARGET)
@@ -47,11 +47,8 @@ RUFF_FIX_FLAGS=--fix
 endif
 endif
 
-RUFF_TARGET:=$(SENTINEL_FOLDER)/ruff.sentinel
-$(RUFF_TARGET): $(MXENV_TARGET)
-	@echo "Install Ruff"
-	@$(PYTHON_PACKAGE_COMMAND) install ruff
-	@touch $(RUFF_TARGET)
+TOOL_REQUIREMENTS+=ruff
+RUFF_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: ruff-check
 ruff-check: $(RUFF_TARGET)
@@ -60,6 +57,7 @@ ruff-check: $(RUFF_TARGET)
 
 .PHONY: ruff-format
 ruff-format: $(RUFF_TARGET)
+	@$(call acquire_lock,format)
 	@echo "Run ruff format"
 	@ruff format $(RUFF_SRC)
 ifeq ("$(RUFF_FIXES)","true")
@@ -73,6 +71,7 @@ ruff-dirty:
 
 .PHONY: ruff-clean
 ruff-clean: ruff-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y ruff || :
 	@rm -rf .ruff_cache
 
@@ -25,11 +25,8 @@
 # test
 ##############################################################################
 
-TEST_TARGET:=$(SENTINEL_FOLDER)/test.sentinel
-$(TEST_TARGET): $(MXENV_TARGET)
-	@echo "Install $(TEST_REQUIREMENTS)"
-	@$(PYTHON_PACKAGE_COMMAND) install $(TEST_REQUIREMENTS)
-	@touch $(TEST_TARGET)
+TOOL_REQUIREMENTS+=$(TEST_REQUIREMENTS)
+TEST_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: test
 test: $(FILES_TARGET) $(SOURCES_TARGET) $(PACKAGES_TARGET) $(TEST_TARGET) $(TEST_DEPENDENCY_TARGETS)
@@ -43,6 +40,7 @@ test-dirty:
 
 .PHONY: test-clean
 test-clean: test-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y $(TEST_REQUIREMENTS) || :
 	@rm -rf .pytest_cache
 
@@ -36,11 +36,8 @@ ifneq ($(TY_PYTHON_VERSION),)
 TY_FLAGS+=--python-version $(TY_PYTHON_VERSION)
 endif
 
-TY_TARGET:=$(SENTINEL_FOLDER)/ty.sentinel
-$(TY_TARGET): $(MXENV_TARGET)
-	@echo "Install ty"
-	@$(PYTHON_PACKAGE_COMMAND) install ty
-	@touch $(TY_TARGET)
+TOOL_REQUIREMENTS+=ty
+TY_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: ty
 ty: $(PACKAGES_TARGET) $(TY_TARGET)
@@ -53,6 +50,7 @@ ty-dirty:
 
 .PHONY: ty-clean
 ty-clean: ty-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y ty || :
 	@rm -rf .ty
 
@@ -25,11 +25,8 @@ ifeq ($(ZPRETTY_SRC),src)
 ZPRETTY_SRC:=$(PYTHON_PROJECT_PREFIX)src
 endif
 
-ZPRETTY_TARGET:=$(SENTINEL_FOLDER)/zpretty.sentinel
-$(ZPRETTY_TARGET): $(MXENV_TARGET)
-	@echo "Install zpretty"
-	@$(PYTHON_PACKAGE_COMMAND) install zpretty
-	@touch $(ZPRETTY_TARGET)
+TOOL_REQUIREMENTS+=zpretty
+ZPRETTY_TARGET:=$(TOOLS_TARGET)
 
 .PHONY: zpretty-check
 zpretty-check: $(ZPRETTY_TARGET)
@@ -47,6 +44,7 @@ zpretty-dirty:
 
 .PHONY: zpretty-clean
 zpretty-clean: zpretty-dirty
+	@$(call acquire_lock,venv)
 	@test -e $(MXENV_PYTHON) && $(MXENV_PYTHON) -m pip uninstall -y zpretty || :
 
 INSTALL_TARGETS+=$(ZPRETTY_TARGET)
@@ -40,7 +40,8 @@
 CURRENT_DIR:=$(shell dirname $(realpath $(lastword $(MAKEFILE_LIST))))
 
 VOLTO_TARGET:=$(SENTINEL_FOLDER)/volto.sentinel
-$(VOLTO_TARGET): $(SENTINEL) package.json mrs.developer.json
+$(VOLTO_TARGET): $(call domain_settings,volto.core) $(call hashed_inputs,volto,package.json mrs.developer.json) | $(SENTINEL)
+	@$(call acquire_lock,node)
 	@echo "Install Volto frontend packages"
 	@pnpm dlx mrs-developer missdev $(VOLTO_MRS_DEVELOPER_PARAMS)
 	@pnpm install
@@ -71,6 +72,7 @@ volto-dirty:
 
 .PHONY: volto-clean
 volto-clean: volto-dirty
+	@$(call acquire_lock,node)
 	@rm -rf core node_modules
 
 INSTALL_TARGETS+=volto-install
@@ -1,16 +1,39 @@
 from pathlib import Path
 
+import hashlib
 import os
 
 
 NAMESPACE = "mxmake-"
 
+# Files of source packages which require reinstalling them on change.
+ADDITIONAL_SOURCES_TARGETS = [
+    "constraints.txt",
+    "pyproject.toml",
+    "requirements.txt",
+    "setup.cfg",
+    "setup.py",
+]
+
 
 def mxmake_files() -> Path:
     """Target folder for mxmake related file generation."""
     return Path(os.environ.get("MXMAKE_FILES", Path(".mxmake") / "files"))
 
 
+def mxmake_cache() -> Path | None:
+    """Folder for persistent caches shared between projects.
+
+    Defaults to ``mxmake`` inside the user cache directory. Caching is disabled
+    if ``MXMAKE_CACHE`` is set to an empty value.
+    """
+    cache = os.environ.get("MXMAKE_CACHE")
+    if cache is not None:
+        return Path(cache) if cache else None
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "mxmake"
+
+
 def gh_actions_path() -> Path:
     """Target folder for github actions related file generation."""
     return Path(
@@ -33,3 +56,20 @@ def list_value(value: str | None) -> list[str]:
     if not value:
         return []
     return [v.strip() for v in value.replace("\n", " ").strip().split(" ")]
+
+
+def content_hash(data: bytes) -> str:
+    """Return hex digest of data."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: Path) -> str | None:
+    """Return hex digest of file contents or ``None`` if file not exists."""
+    digest = hashlib.sha256()
+    try:
+        with path.open("rb") as f:
+            while chunk := f.read(65536):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()